@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import shutil
+import sqlite3
 import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -10,13 +11,25 @@ import pytest
 
 from vibe_linter.engine.executor import Executor, SubmitResult
 from vibe_linter.engine.node_loader import _NODE_REGISTRY, load_nodes
+from vibe_linter.store.state import StateManager
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from contextlib import AbstractContextManager
+
     from vibe_linter.types import NodeDefinition
 
 FLOWS_DIR = Path(__file__).parent / ".vibe" / "flows"
 
 
+def build_vibe_dir(vibe_dir: Path, flow_file: str) -> None:
+    """Create a .vibe directory holding one flow file and an empty nodes dir."""
+    vibe_dir.mkdir()
+    (vibe_dir / "flows").mkdir()
+    (vibe_dir / "nodes").mkdir()
+    shutil.copy2(FLOWS_DIR / flow_file, vibe_dir / "flows" / flow_file)
+
+
 class FlowHarness:
     """Test harness for driving a workflow through the executor.
 
@@ -25,19 +38,25 @@ class FlowHarness:
     Executor public API and return SubmitResult.
     """
 
-    def __init__(self, flow_file: str, *, loop_data: dict | None = None):
-        self.tmp = Path(tempfile.mkdtemp())
+    __slots__ = ("_loop_data", "executor", "flow_name", "tmp", "vibe_dir")
+
+    def __init__(
+        self,
+        flow_file: str,
+        *,
+        loop_data: dict | None = None,
+        template: Path | None = None,
+        tmp: Path | None = None,
+    ):
+        self.tmp = tmp or Path(tempfile.mkdtemp())
         self.vibe_dir = self.tmp / ".vibe"
-        self.vibe_dir.mkdir()
-        (self.vibe_dir / "flows").mkdir()
-        (self.vibe_dir / "nodes").mkdir()
-
-        src = FLOWS_DIR / flow_file
-        dst = self.vibe_dir / "flows" / flow_file
-        shutil.copy2(src, dst)
+        if template is not None:
+            shutil.copytree(template, self.vibe_dir)
+        else:
+            build_vibe_dir(self.vibe_dir, flow_file)
 
         self.flow_name = flow_file.removesuffix(".yaml")
-        self.executor = Executor(self.vibe_dir)
+        self.executor = self._open_executor()
 
         # Pre-seed loop data so iterate expressions resolve
         self._loop_data = loop_data or {}
@@ -53,15 +72,16 @@ class FlowHarness:
 
     @property
     def state(self):
-        return self.executor.state_manager.get_current_state()
+        """The executor's shared cached state: no decoding per access, read-only."""
+        return self.executor.state_manager.peek_state()
 
     @property
     def step(self) -> str:
-        return self.state.current_step
+        return self.executor.state_manager.peek_state().current_step
 
     @property
     def status(self) -> str:
-        return self.state.status
+        return self.executor.state_manager.peek_state().status
 
     def submit(self, data: dict | None = None) -> SubmitResult:
         return self.executor.submit(data or {})
@@ -93,34 +113,114 @@ class FlowHarness:
     def resume(self) -> SubmitResult:
         return self.executor.resume()
 
+    def batch(self) -> AbstractContextManager[None]:
+        """Commit every call made inside the with-block as one transaction."""
+        return self.executor.state_manager.transaction()
+
+    def approve_and_goto(self, target: str) -> SubmitResult:
+        """Approve a WAIT+LLM step and choose target in one executor call.
+
+        The approval's submit carries the _goto, so one submit is recorded.
+        """
+        return self.approve({"_goto": target})
+
+    def finalize(self, review_step: str, final_step: str = "Done") -> SubmitResult:
+        """Enter a WAIT+LLM review step, approve it and choose final_step."""
+        r = self.submit_goto(review_step)
+        if not r:
+            return r
+        return self.approve_and_goto(final_step)
+
+    def run_script(self, ops: Iterable[tuple]) -> SubmitResult:
+        """Run (action, *args) ops as one transaction; return the last result.
+
+        action is a harness method name. Stops with an AssertionError at the
+        first op that fails.
+        """
+        r = SubmitResult(False, "empty script")
+        with self.batch():
+            for action, *args in ops:
+                r = getattr(self, action)(*args)
+                if not r:
+                    raise AssertionError(f"{action}{tuple(args)!r} failed: {r.message}")
+        return r
+
     def reset(self):
-        self.executor.state_manager.reset()
+        self.executor.reset()
 
     def get_status(self) -> dict:
         return self.executor.get_status()
 
-    def get_history(self, limit: int = 50) -> list[dict]:
-        return self.executor.get_history(limit)
+    def get_history(self, limit: int = 50, action: str | None = None) -> list[dict]:
+        return self.executor.get_history(limit, action)
+
+    def iter_history(self, limit: int = 50, action: str | None = None) -> Iterator[dict]:
+        """Newest-first history entries without materializing a list."""
+        return self.executor.iter_history(limit, action)
+
+    def assert_state(
+        self,
+        r: SubmitResult | None = None,
+        *,
+        new_step: str | None = None,
+        step: str | None = None,
+        status: str | None = None,
+    ) -> None:
+        """Check a result and the resulting position in one call.
+
+        r must have succeeded; each given keyword must match. The first
+        mismatch raises one AssertionError describing it.
+        """
+        if r is not None and not r:
+            raise AssertionError(f"expected success, got failure: {r.message}")
+        if new_step is not None and r is not None and r.new_step != new_step:
+            raise AssertionError(f"expected new_step={new_step!r}, got {r.new_step!r}")
+        state = self.executor.state_manager.peek_state()
+        if step is not None and state.current_step != step:
+            raise AssertionError(f"expected step={step!r}, got {state.current_step!r}")
+        if status is not None and state.status != status:
+            raise AssertionError(f"expected status={status!r}, got {state.status!r}")
+
+    def submit_expect(
+        self, data: dict | None = None, *, step: str, status: str | None = None
+    ) -> SubmitResult:
+        """Submit data and check that it succeeded and moved to step (and status)."""
+        r = self.submit(data)
+        self.assert_state(r, new_step=step, step=step, status=status)
+        return r
+
+    def loop_iter_index(self, loop_step: str) -> int:
+        """Zero-based index of the current iteration of loop_step."""
+        return self.executor.state_manager.peek_state().loop_state[loop_step]["i"]
+
+    def history_has(self, action: str) -> bool:
+        return self.last_of(action) is not None
+
+    def last_of(self, action: str) -> dict | None:
+        """Most recent history entry with this action, or None."""
+        return next(self.executor.iter_history(1, action), None)
 
     def advance_to(self, target_step: str, max_steps: int = 30):
         """Submit empty data repeatedly until reaching the target step.
 
         For LLM-condition steps, uses _goto to choose a path.
+        The submits are committed together as one transaction.
         """
-        for _ in range(max_steps):
-            if self.step == target_step:
-                return
-            s = self.state
-            if s.status == "waiting":
-                self.approve()
-                continue
-            if s.status in ("done", "stopped"):
-                break
-            # Try plain submit; if stuck, it means LLM conditions
-            r = self.executor.submit({})
-            if not r.success or r.new_step == s.current_step:
-                # LLM condition - need _goto
-                break
+        with self.batch():
+            for _ in range(max_steps):
+                if self.step == target_step:
+                    return
+                s = self.executor.state_manager.peek_state()
+                if s.status == "waiting":
+                    self.approve()
+                    continue
+                if s.status in ("done", "stopped"):
+                    break
+                # Try plain submit; if stuck, it means LLM conditions
+                r = self.executor.submit({})
+                if not r.success or r.new_step == s.current_step:
+                    # LLM condition - need _goto
+                    break
         if self.step != target_step:
             raise RuntimeError(
                 f"Could not advance to {target_step!r}, stuck at {self.step!r} ({self.status})"
@@ -136,7 +236,15 @@ class FlowHarness:
         Simulates user closing a session and reopening later.
         """
         self.executor.close()
-        self.executor = Executor(self.vibe_dir)
+        self.executor = self._open_executor()
+
+    def _open_executor(self) -> Executor:
+        """Open an executor on the harness's state.db without fsync on commit.
+
+        The database stays a real file so hook subprocesses and new_executor()
+        see the same state; only durability against power loss is given up.
+        """
+        return Executor(self.vibe_dir, durable=False)
 
     def install_node(self, filename: str, code: str) -> None:
         """Write a node definition file into .vibe/nodes/."""
@@ -153,8 +261,13 @@ class FlowHarness:
         The executor looks up nodes via get_node(step.name), so the registry
         key must match the step name exactly.
         """
-        node_def.name = step_name
-        _NODE_REGISTRY[step_name] = node_def
+        self.register_nodes({step_name: node_def})
+
+    def register_nodes(self, node_defs: dict[str, NodeDefinition]) -> None:
+        """Register several node definitions, keyed by step name, in one update."""
+        for step_name, node_def in node_defs.items():
+            node_def.name = step_name
+        _NODE_REGISTRY.update(node_defs)
 
     def get_archived_rows(self, table_name: str) -> list[dict]:
         """Query rows from an archive table created by a node."""
@@ -176,6 +289,25 @@ class FlowHarness:
     def load_checkpoint(self, name: str):
         return self.executor.state_manager.load_checkpoint(name)
 
+    def snapshot(self) -> sqlite3.Connection:
+        """Copy the whole state.db (state, history, archives) into memory."""
+        snap = sqlite3.connect(":memory:")
+        self.executor.state_manager.db.backup(snap)
+        return snap
+
+    def restore(self, snap: sqlite3.Connection) -> None:
+        """Overwrite state.db with a snapshot() and reopen the executor on it."""
+        self.executor.close()
+        db = sqlite3.connect(self.vibe_dir / "state.db")
+        try:
+            snap.backup(db)
+        finally:
+            db.close()
+        self.executor = self._open_executor()
+        # Load the flow and node files now, as the walk did; loading them
+        # lazily later would clear nodes the test registers after restoring
+        self.executor.get_status()
+
     def reload_yaml(self, new_content: str):
         """Overwrite the flow YAML and clear the cached flow definition."""
         path = self.vibe_dir / "flows" / f"{self.flow_name}.yaml"
@@ -189,12 +321,81 @@ class FlowHarness:
         self.close()
 
 
+@pytest.fixture(scope="session")
+def vibe_templates(tmp_path_factory):
+    """Session-wide .vibe skeletons, one per flow file.
+
+    Each template holds the flow YAML and a state.db whose schema is already
+    created, so a harness only has to copy the directory instead of rebuilding
+    it and running the schema DDL for every test.
+    """
+    templates: dict[str, Path] = {}
+
+    def _get(flow_file: str) -> Path:
+        if flow_file not in templates:
+            vibe_dir = tmp_path_factory.mktemp("template") / ".vibe"
+            build_vibe_dir(vibe_dir, flow_file)
+            StateManager(vibe_dir / "state.db").close()
+            templates[flow_file] = vibe_dir
+        return templates[flow_file]
+
+    return _get
+
+
+@pytest.fixture(scope="session")
+def walk_snapshots():
+    """Session-wide cache of state.db snapshots taken after walk helpers.
+
+    walk_snapshots(h, walk, *key) brings h to the state walk(h) produces.
+    The first call per (walk, flow, key) runs the walk with its assertions
+    and snapshots the database together with the state it ended in. Every
+    later call restores the snapshot and checks that the harness reports
+    that same state: step, status, data, loop_state and history. Whichever
+    test runs first, the walk's assertions run once per session and every
+    restored harness is held to their outcome. Snapshots are closed at
+    teardown.
+    """
+    snapshots: dict[tuple, tuple[sqlite3.Connection, tuple]] = {}
+
+    def _run(h: FlowHarness, walk: Callable[[FlowHarness], object], *key: object) -> None:
+        cache_key = (walk, h.flow_name, *key)
+        entry = snapshots.get(cache_key)
+        if entry is None:
+            walk(h)
+            snapshots[cache_key] = (h.snapshot(), _walk_outcome(h))
+        else:
+            snap, outcome = entry
+            h.restore(snap)
+            assert _walk_outcome(h) == outcome, f"restored {walk.__name__} state differs"
+
+    yield _run
+
+    for snap, _ in snapshots.values():
+        snap.close()
+
+
+def _walk_outcome(h: FlowHarness) -> tuple:
+    """Everything a walk helper's assertions establish about the harness."""
+    state = h.state
+    history = [(e["step_path"], e["action"], e["data"]) for e in h.iter_history(10_000)]
+    return (state.current_step, state.status, state.data, state.loop_state, history)
+
+
 @pytest.fixture
-def harness_factory():
-    """Factory fixture that creates FlowHarness instances and cleans up after test."""
+def harness_factory(vibe_templates, tmp_path_factory):
+    """Factory fixture that creates FlowHarness instances and cleans up after test.
+
+    Harness directories live under pytest's base temp dir, which is private to
+    each xdist worker, so parallel runs never contend on a state.db file.
+    """
     created: list[FlowHarness] = []
 
     def _make(flow_file: str, **kwargs) -> FlowHarness:
+        # Only build defaults that are needed: mktemp() creates a directory
+        if "template" not in kwargs:
+            kwargs["template"] = vibe_templates(flow_file)
+        if "tmp" not in kwargs:
+            kwargs["tmp"] = tmp_path_factory.mktemp("harness")
         h = FlowHarness(flow_file, **kwargs)
         created.append(h)
         return h
@@ -0,0 +1,160 @@
+"""Tests for Executor's public read API (get_data / get_status)."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from vibe_linter.engine.executor import Executor
+from vibe_linter.engine.node_loader import _NODE_REGISTRY
+from vibe_linter.store import HISTORY_LIMIT
+from vibe_linter.types import EditPolicy, NodeDefinition
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+FLOW_YAML = """
+name: Api Flow
+description: Flow for testing the executor's read API
+
+steps:
+  - first
+
+  - review:
+      type: wait
+      next:
+        - if: "looks good"
+          go: Done
+        - go: first
+
+  - Done:
+      type: terminate
+"""
+
+
+@pytest.fixture
+def vibe_dir(tmp_path: Path) -> Path:
+    vibe = tmp_path / ".vibe"
+    (vibe / "flows").mkdir(parents=True)
+    (vibe / "nodes").mkdir()
+    (vibe / "flows" / "api.yaml").write_text(FLOW_YAML, encoding="utf-8")
+    return vibe
+
+
+@pytest.fixture
+def executor(vibe_dir: Path) -> Iterator[Executor]:
+    ex = Executor(vibe_dir)
+    ex.start("api")
+    ex.submit({"note": {"text": "hello"}})
+    yield ex
+    ex.close()
+
+
+def test_get_data_returns_a_copy(executor, vibe_dir):
+    data = executor.get_data()
+    data["injected"] = 1
+    data["first"]["note"]["text"] = "changed"
+
+    assert executor.get_data() == {"first": {"note": {"text": "hello"}}}
+    other = Executor(vibe_dir)
+    try:
+        assert other.get_data() == executor.get_data()
+    finally:
+        other.close()
+
+
+def test_get_status_data_and_decisions_are_copies(executor):
+    status = executor.get_status()
+    status["data"]["also"] = 2
+    status["data"]["first"]["note"] = None
+    status["pending_decisions"][0]["target"] = "nowhere"
+
+    again = executor.get_status()
+    assert again["data"] == {"first": {"note": {"text": "hello"}}}
+    assert again["pending_decisions"][0]["target"] == "Done"
+
+
+def test_get_status_node_reflects_edits(executor, monkeypatch):
+    executor.goto("first")
+    node_def = NodeDefinition(
+        name="first", instructions="v1", edit_policy=EditPolicy(default="warn")
+    )
+    monkeypatch.setitem(_NODE_REGISTRY, "first", node_def)
+    first = executor.get_status()["node"]
+    first["edit_policy"]["default"] = "silent"
+
+    node_def.instructions = "v2"
+    node_def.edit_policy.default = "block"
+    node = executor.get_status()["node"]
+    assert node["instructions"] == "v2"
+    assert node["edit_policy"] == {"default": "block", "patterns": []}
+
+
+NODE_PY = """\
+from vibe_linter.engine.node_loader import node
+
+@node("validate")
+def first():
+    return {"instructions": "added after reset"}
+"""
+
+
+def test_start_after_reset_loads_new_node_files(executor, vibe_dir):
+    executor.reset()
+    (vibe_dir / "nodes" / "first.py").write_text(NODE_PY, encoding="utf-8")
+    executor.start("api")
+
+    assert executor.get_status()["node"]["instructions"] == "added after reset"
+
+
+def test_start_after_reset_reads_edited_yaml(executor, vibe_dir):
+    executor.reset()
+    flow_path = vibe_dir / "flows" / "api.yaml"
+    flow_path.write_text(
+        FLOW_YAML.replace("  - first\n", "  - intro\n\n  - first\n", 1), encoding="utf-8"
+    )
+    executor.start("api")
+
+    assert executor.get_status()["current_step"] == "intro"
+
+
+def test_failed_call_rolls_back_every_write(executor, monkeypatch):
+    """A mutating call is one transaction: an error leaves no partial writes."""
+    executor.approve()
+    before = executor.get_status()
+    history = executor.state_manager.get_history(limit=100)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(executor.state_manager, "add_history", fail)
+    with pytest.raises(RuntimeError, match="disk full"):
+        executor.goto("first")
+    monkeypatch.undo()
+
+    assert executor.get_status() == before
+    assert executor.state_manager.get_history(limit=100) == history
+
+
+def test_history_capped_by_default(vibe_dir):
+    ex = Executor(vibe_dir)
+    try:
+        assert ex.state_manager.history_limit == HISTORY_LIMIT
+    finally:
+        ex.close()
+
+
+def test_long_running_workflow_history_stays_capped(vibe_dir):
+    ex = Executor(vibe_dir, history_limit=50)
+    try:
+        ex.start("api")
+        for _ in range(200):
+            ex.submit({"n": 1})
+            ex.reject("again")
+        history = ex.get_history(limit=1000)
+    finally:
+        ex.close()
+    # Far more rows were written than kept; trimmed every 50 inserts to the newest 50
+    assert history[0]["id"] > 200
+    assert 50 <= len(history) < 100
@@ -0,0 +1,83 @@
+"""Tests for the {{expr}} expression compiler.
+
+Expected values are what the original interpreting evaluator returned for
+the same expressions and context.
+"""
+from __future__ import annotations
+
+import pytest
+
+from vibe_linter.engine.expression import (
+    compile_condition,
+    compile_expression,
+    evaluate_condition,
+    evaluate_expression,
+    evaluate_template,
+)
+
+CONTEXT = {
+    "score": 7,
+    "name": "ok",
+    "items": [{"id": 1}, {"id": 2}],
+    "flags": {"done": True, "n": 0},
+    "pi": 3.5,
+    "nothing": None,
+    "tag": "v1",
+}
+
+CASES = [
+    ("score", 7),
+    (" score ", 7),
+    ("score > 5", True),
+    ("score >= 7", True),
+    ("score < 7", False),
+    ("score <= 6", False),
+    ("score == 7", True),
+    ("score != 7", False),
+    ("score === 7", True),
+    ("score !== 8", True),
+    ("-2 < score", True),
+    ("pi > 3.25", True),
+    ("name == 'ok'", True),
+    ('name == "no"', False),
+    ("tag == v1", False),
+    ("flags.done", True),
+    ("flags.done == true", True),
+    ("flags.n", 0),
+    ("flags.n == 0", True),
+    ("flags.missing", None),
+    ("missing.deep", None),
+    ("nothing.x", None),
+    ("items[1].id", 2),
+    ("items[0].id == 1", True),
+    ("'a'", "a"),
+    ("true", True),
+    ("false", False),
+    ("12", 12),
+    ("1.5", 1.5),
+]
+
+
+@pytest.mark.parametrize(("expr", "expected"), CASES)
+def test_compiled_matches_interpreted(expr, expected):
+    value = compile_expression(expr)(CONTEXT)
+    assert value == expected
+    assert type(value) is type(expected)
+    assert evaluate_expression(expr, CONTEXT) == expected
+
+
+@pytest.mark.parametrize(("expr", "expected"), CASES)
+def test_compiled_condition_matches_interpreted(expr, expected):
+    assert compile_condition(expr)(CONTEXT) is bool(expected)
+    assert evaluate_condition(expr, CONTEXT) is bool(expected)
+
+
+def test_compiled_expression_is_reused_across_contexts():
+    predicate = compile_condition("score > 5")
+    assert predicate(CONTEXT) is True
+    assert predicate({"score": 1}) is False
+    assert compile_expression("score > 5") is compile_expression("score > 5")
+
+
+def test_template():
+    assert evaluate_template("{{name}}: {{ score }} {{nothing}}", CONTEXT) == "ok: 7 "
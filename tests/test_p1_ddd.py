@@ -1923,6 +1923,10 @@ def test_edit_policy_reported_in_status(harness_factory):
     assert status["current_step"] == "2.1 Design aggregates and entities"
     assert status["node"] is not None
     assert status["node"]["edit_policy"]["default"] == "warn"
+    assert status["node"]["edit_policy"]["patterns"] == [
+        {"glob": "src/domain/**", "policy": "silent"},
+        {"glob": "src/infra/**", "policy": "block"},
+    ]
 
 
 def test_resume_wait_step_restores_waiting(harness_factory):
@@ -27,6 +27,7 @@ Dimensions tested per scenario:
 """
 from __future__ import annotations
 
+from vibe_linter.engine import RejectCode
 from vibe_linter.types import EditPolicy, NodeDefinition
 
 # ─── Helpers ───
@@ -101,7 +102,7 @@ def test_scenario_1_linear_walkthrough(harness_factory):
     # Wait step arrival: submit is rejected
     r = h.submit({})
     assert not r
-    assert "waiting" in r.message.lower()
+    assert r.code is RejectCode.WAITING
 
     # README approved -> implementation (WAIT+LLM: approve first, then submit_goto)
     r = h.approve()
@@ -176,7 +177,7 @@ def test_scenario_1_linear_walkthrough(harness_factory):
     # Verify done state
     r = h.submit({})
     assert not r
-    assert "completed" in r.message.lower() or "Workflow is already completed" in r.message
+    assert r.code is RejectCode.DONE
 
 
 def test_scenario_2_readme_review_rejected(harness_factory):
@@ -334,18 +335,7 @@ def test_scenario_3_alignment_fails_back_to_implementation(harness_factory):
     assert h.step == "3.1 Align code with README"
 
     # This time alignment passes
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -435,18 +425,7 @@ def test_scenario_4_repeated_alignment_3_rounds(harness_factory):
     r = h.submit({"passed": 24, "failed": 0, "coverage": "96%"})
     assert r
     assert h.step == "3.1 Align code with README"
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -459,60 +438,39 @@ def test_scenario_5_skip_testing(harness_factory):
     assert r
 
     # Get through README review (WAIT+LLM)
-    r = h.submit({
+    h.submit_expect({
         "readme": (
             "# confparse -- Multi-format Config Parser\n\n"
             "Supports YAML, TOML, JSON, and INI with a unified API.\n\n"
             "```python\nfrom confparse import load\nconfig = load('app.toml')\n```"
         ),
-    })
-    assert r
+    }, step="1.2 README review", status="waiting")
     r = h.approve()
-    assert r
+    h.assert_state(r, step="1.2 README review", status="running")
     r = h.submit_goto("2.1 Implement code")
-    assert r
-    assert h.step == "2.1 Implement code"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.1 Implement code", step="2.1 Implement code", status="running")
 
-    r = h.submit({
+    h.submit_expect({
         "files": ["confparse/loader.py", "confparse/parsers/toml.py", "confparse/parsers/yaml.py"],
         "note": "V2 refactor -- parsers extracted to plugins, tests from v1 still apply",
-    })
-    assert r
-    assert r.new_step == "2.2 Write tests"
-    assert h.step == "2.2 Write tests"
+    }, step="2.2 Write tests", status="running")
 
     # Skip writing tests -- v1 test suite is comprehensive and still valid
     r = h.skip("Tests already exist from v1 (42 tests in tests/test_confparse.py)")
-    assert r
-    assert r.new_step == "2.3 Run tests"
-    assert h.step == "2.3 Run tests"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.3 Run tests", step="2.3 Run tests", status="running")
 
     # Run existing tests
-    r = h.submit({
+    h.submit_expect({
         "command": "pytest tests/ -v",
         "passed": 42, "failed": 0, "coverage": "88%",
-    })
-    assert r
-    assert h.step == "3.1 Align code with README"
-    assert h.status == "running"
+    }, step="3.1 Align code with README", status="running")
 
     r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
+    h.assert_state(r, new_step="3.2 Final review", step="3.2 Final review", status="waiting")
     r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
+    h.assert_state(r, step="3.2 Final review", status="running")
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
 
 def test_scenario_6_stop_then_resume(harness_factory):
@@ -582,18 +540,7 @@ def test_scenario_6_stop_then_resume(harness_factory):
     assert r
     assert h.step == "3.1 Align code with README"
 
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -606,32 +553,25 @@ def test_scenario_7_complete_then_reset(harness_factory):
     assert r
 
     # Quick path to Done (WAIT+LLM steps need approve + submit_goto)
-    r = h.submit({
-        "readme": "# dotenv-go\nLoad .env files into os.Environ with type coercion.",
-    })
-    assert r
+    h.submit_expect(
+        {"readme": "# dotenv-go\nLoad .env files into os.Environ with type coercion."},
+        step="1.2 README review", status="waiting",
+    )
     r = h.approve()
-    assert r
+    h.assert_state(r, step="1.2 README review", status="running")
     r = h.submit_goto("2.1 Implement code")
-    assert r
-    r = h.submit({"files": ["dotenv.go", "parser.go"]})
-    assert r
-    r = h.submit({"test_file": "dotenv_test.go", "count": 20})
-    assert r
-    r = h.submit({"passed": 20, "failed": 0})
-    assert r
+    h.assert_state(r, new_step="2.1 Implement code", step="2.1 Implement code", status="running")
+    h.submit_expect({"files": ["dotenv.go", "parser.go"]}, step="2.2 Write tests")
+    h.submit_expect({"test_file": "dotenv_test.go", "count": 20}, step="2.3 Run tests")
+    h.submit_expect(
+        {"passed": 20, "failed": 0}, step="3.1 Align code with README", status="running"
+    )
     r = h.submit_goto("3.2 Final review")
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
+    h.assert_state(r, new_step="3.2 Final review", step="3.2 Final review", status="waiting")
     r = h.approve()
-    assert r
+    h.assert_state(r, step="3.2 Final review", status="running")
     r = h.submit_goto("Done")
-    assert r
-
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
     # Verify completed state
     status = h.get_status()
@@ -641,7 +581,7 @@ def test_scenario_7_complete_then_reset(harness_factory):
     # Verify done state: further submits rejected
     r = h.submit({})
     assert not r
-    assert "completed" in r.message.lower() or "Workflow is already completed" in r.message
+    assert r.code is RejectCode.DONE
 
     # V1 shipped. Reset to start V2 with encrypted .env.vault support
     h.reset()
@@ -694,19 +634,7 @@ def test_scenario_8_goto_test_step(harness_factory):
     assert h.step == "3.1 Align code with README"
     assert h.status == "running"
 
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -786,15 +714,7 @@ def test_scenario_9_back(harness_factory):
     assert r
     assert h.step == "3.1 Align code with README"
 
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    r = h.approve()
-    assert r
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -904,18 +824,7 @@ steps:
     assert r
     assert h.step == "3.1 Align code with README"
 
-    r = h.submit_goto("3.2 Final review")
-    assert r
-    assert r.new_step == "3.2 Final review"
-    assert h.step == "3.2 Final review"
-    assert h.status == "waiting"
-
-    r = h.approve()
-    assert r
-    assert h.step == "3.2 Final review"
-    assert h.status == "running"
-
-    r = h.submit_goto("Done")
+    r = h.finalize("3.2 Final review")
     assert r
     assert h.step == "Done"
     assert h.status == "done"
@@ -936,10 +845,10 @@ def test_data_accumulates_readme(harness_factory):
     assert data["1.1 Write README draft"]["readme"] == "# My Project"
 
 
-def test_data_accumulates_implementation(harness_factory):
+def test_data_accumulates_implementation(harness_factory, walk_snapshots):
     """Data submitted during implementation phase persists."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
 
     h.submit({"code": "main.py", "lines": 150})
     data = h.state.data
@@ -1005,15 +914,14 @@ def test_history_records_goto(harness_factory):
     h.start()
     h.goto("2.1 Implement code")
 
-    history = h.get_history(10)
-    actions = [e["action"] for e in history]
+    actions = [e["action"] for e in h.iter_history(10)]
     assert "goto" in actions
 
 
-def test_history_records_skip(harness_factory):
+def test_history_records_skip(harness_factory, walk_snapshots):
     """Skip reason appears in history."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
     h.submit({})
     assert h.step == "2.2 Write tests"
 
@@ -1024,10 +932,10 @@ def test_history_records_skip(harness_factory):
     assert skip_entries[0]["data"] == "tests exist"
 
 
-def test_history_records_reject(harness_factory):
+def test_history_records_reject(harness_factory, walk_snapshots):
     """Reject action appears in history."""
     h = harness_factory("p1-rdd.yaml")
-    _walk_to_readme_review(h)
+    walk_snapshots(h, _walk_to_readme_review)
 
     h.reject("too brief")
     history = h.get_history(10)
@@ -1040,10 +948,10 @@ def test_history_records_reject(harness_factory):
 # Cross-executor recovery tests
 # ===============================================================
 
-def test_cross_executor_at_readme_review(harness_factory):
+def test_cross_executor_at_readme_review(harness_factory, walk_snapshots):
     """Close executor at README review, reopen, continue."""
     h = harness_factory("p1-rdd.yaml")
-    _walk_to_readme_review(h)
+    walk_snapshots(h, _walk_to_readme_review)
 
     h.new_executor()
 
@@ -1056,10 +964,10 @@ def test_cross_executor_at_readme_review(harness_factory):
     assert h.step == "2.1 Implement code"
 
 
-def test_cross_executor_at_implementation(harness_factory):
+def test_cross_executor_at_implementation(harness_factory, walk_snapshots):
     """Close executor during implementation, reopen, state preserved."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
     h.submit({"code": "main.py"})
     assert h.step == "2.2 Write tests"
 
@@ -1069,10 +977,10 @@ def test_cross_executor_at_implementation(harness_factory):
     assert h.status == "running"
 
 
-def test_cross_executor_at_alignment(harness_factory):
+def test_cross_executor_at_alignment(harness_factory, walk_snapshots):
     """Close executor at alignment check, reopen, continue."""
     h = harness_factory("p1-rdd.yaml")
-    _walk_to_alignment(h)
+    walk_snapshots(h, _walk_to_alignment)
 
     h.new_executor()
 
@@ -1100,10 +1008,10 @@ def test_cross_executor_at_done(harness_factory):
     assert not r
 
 
-def test_cross_executor_stop_resume(harness_factory):
+def test_cross_executor_stop_resume(harness_factory, walk_snapshots):
     """Stop, close executor, reopen, resume."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
 
     h.stop()
     assert h.status == "stopped"
@@ -1144,10 +1052,10 @@ def test_node_validates_readme(harness_factory):
     assert r.new_step == "1.2 README review"
 
 
-def test_node_validates_code(harness_factory):
+def test_node_validates_code(harness_factory, walk_snapshots):
     """Validate node rejects missing code at 2.1."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
 
     h.register_node(
         "2.1 Implement code",
@@ -1166,10 +1074,10 @@ def test_node_validates_code(harness_factory):
     assert r.new_step == "2.2 Write tests"
 
 
-def test_node_validates_tests(harness_factory):
+def test_node_validates_tests(harness_factory, walk_snapshots):
     """Validate node rejects missing tests at 2.2."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
     h.submit({"code": "main.py"})
     assert h.step == "2.2 Write tests"
 
@@ -1218,10 +1126,10 @@ def test_node_archives_readme(harness_factory):
     assert rows[0]["version"] == "v1"
 
 
-def test_node_archives_code(harness_factory):
+def test_node_archives_code(harness_factory, walk_snapshots):
     """Archive node writes implementation data to SQLite."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
 
     h.register_node(
         "2.1 Implement code",
@@ -1241,10 +1149,10 @@ def test_node_archives_code(harness_factory):
     assert rows[0]["module"] == "auth.py"
 
 
-def test_node_archives_multiple_alignment_rounds(harness_factory):
+def test_node_archives_multiple_alignment_rounds(harness_factory, walk_snapshots):
     """Archive node at 2.1 accumulates rows across alignment retry rounds."""
     h = harness_factory("p1-rdd.yaml")
-    _enter_implementation(h)
+    walk_snapshots(h, _enter_implementation)
 
     h.register_node(
         "2.1 Implement code",
@@ -1256,11 +1164,11 @@ def test_node_archives_multiple_alignment_rounds(harness_factory):
         ),
     )
 
-    # Round 1
-    h.submit({"attempt": "round1"})
-    h.submit({})
-    h.submit({})
-    h.submit_goto("2.1 Implement code")
+    # Round 1, committed as one transaction
+    with h.batch():
+        h.submit({"attempt": "round1"})
+        h.advance_to("3.1 Align code with README")
+        h.submit_goto("2.1 Implement code")
 
     # Round 2
     h.submit({"attempt": "round2"})
@@ -1273,14 +1181,14 @@ def test_node_archives_multiple_alignment_rounds(harness_factory):
 # Error boundary tests
 # ===============================================================
 
-def test_submit_on_waiting_fails(harness_factory):
+def test_submit_on_waiting_fails(harness_factory, walk_snapshots):
     """Submit while waiting returns failure."""
     h = harness_factory("p1-rdd.yaml")
-    _walk_to_readme_review(h)
+    walk_snapshots(h, _walk_to_readme_review)
 
     r = h.submit({"data": "should fail"})
     assert not r
-    assert "waiting" in r.message.lower()
+    assert r.code is RejectCode.WAITING
 
 
 def test_approve_on_running_fails(harness_factory):
@@ -1338,6 +1246,7 @@ def test_stop_on_done_fails(harness_factory):
 
     r = h.stop()
     assert not r
+    assert r.code is RejectCode.DONE
 
 
 def test_stop_on_stopped_fails(harness_factory):
@@ -1359,6 +1268,7 @@ def test_resume_on_non_stopped_fails(harness_factory):
 
     r = h.resume()
     assert not r
+    assert r.code is RejectCode.NOT_STOPPED
 
 
 # ===============================================================
@@ -1395,8 +1305,7 @@ def test_retry_stays_at_current(harness_factory):
     assert h.step == "1.1 Write README draft"
     assert h.status == "running"
 
-    history = h.get_history(5)
-    actions = [e["action"] for e in history]
+    actions = [e["action"] for e in h.iter_history(5)]
     assert "retry" in actions
 
 
@@ -1469,10 +1378,10 @@ def test_reset_clears_data(harness_factory):
     assert h.state is None
 
 
-def test_reject_preserves_data(harness_factory):
+def test_reject_preserves_data(harness_factory, walk_snapshots):
     """Reject does not modify state.data."""
     h = harness_factory("p1-rdd.yaml")
-    _walk_to_readme_review(h)
+    walk_snapshots(h, _walk_to_readme_review)
 
     data_before = dict(h.state.data)
     h.reject("nope")
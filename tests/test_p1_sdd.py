@@ -23,36 +23,152 @@ Dimensions tested per scenario:
 """
 from __future__ import annotations
 
+import pytest
+
+from vibe_linter.engine import RejectCode
 from vibe_linter.types import EditPolicy, NodeDefinition
 
+# p1-sdd.yaml with a "2.1b Code review" step inserted into the phase loop
+_SDD_WITH_CODE_REVIEW_YAML = """name: SDD Development
+description: Spec-Driven Development with code review
+
+steps:
+  - 1.1 Write specification:
+      type: wait
+
+  - 1.2 Generate implementation plan
+
+  - 1.3 Plan review:
+      type: wait
+      next:
+        - if: "plan is approved"
+          go: 2.0 Phase loop
+        - go: 1.2 Generate implementation plan
+
+  - 2.0 Phase loop:
+      iterate: "phases"
+      children:
+        - 2.1 Implement phase
+        - 2.1b Code review
+        - 2.2 Run phase tests
+        - 2.3 Compliance check:
+            next:
+              - if: "implementation conforms to spec"
+                go: 2.0 Phase loop
+              - if: "implementation does not conform, code needs fixes"
+                go: 2.1 Implement phase
+              - if: "spec itself has issues"
+                go: 1.1 Write specification
+
+  - 3.1 Integration testing
+
+  - 3.2 Final verification:
+      next:
+        - if: "all phases conform to spec"
+          go: Done
+        - go: 2.0 Phase loop
+
+  - Done:
+      type: terminate
+      reason: All phases conform to specification
+"""
+
 # ─── Helpers ───
 
 
+# start -> approve 1.1 -> submit 1.2 -> arrive at 1.3 (waiting)
+_PLAN_REVIEW_SCRIPT = (
+    ("start",),
+    ("approve", {"spec": "detailed specification"}),
+    ("submit", {"plan": "implementation plan v1"}),
+)
+
+
 def _walk_to_plan_review(h):
-    """Common helper: start -> approve 1.1 -> submit 1.2 -> arrive at 1.3 (waiting)."""
-    h.start()
-    h.approve({"spec": "detailed specification"})
-    h.submit({"plan": "implementation plan v1"})
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    """Common helper: run _PLAN_REVIEW_SCRIPT and check we wait at 1.3."""
+    h.run_script(_PLAN_REVIEW_SCRIPT)
+    h.assert_state(step="1.3 Plan review", status="waiting")
 
 
 def _enter_phase_loop(h):
     """Common helper: get past plan review into loop iteration 1."""
     _walk_to_plan_review(h)
-    h.approve()
-    h.submit_goto("2.0 Phase loop")
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(step="2.1 Implement phase", status="running")
+
+
+@pytest.fixture
+def at_phase_loop(harness_factory, walk_snapshots):
+    """Factory for p1-sdd harnesses already at 2.1 of the first loop iteration.
+
+    The walk runs once per phase list; later harnesses restore its snapshot.
+    """
+    def make(phases: list[str]):
+        h = harness_factory("p1-sdd.yaml", loop_data={"phases": phases})
+        walk_snapshots(h, _enter_phase_loop, tuple(phases))
+        return h
+
+    return make
 
 
 def _do_one_phase_pass(h, data=None):
     """Complete one implement-test-compliance cycle ending at compliance check."""
-    h.submit(data or {"impl": "code"})    # 2.1 -> 2.2
-    h.submit(data or {"tests": "pass"})   # 2.2 -> 2.3
+    h.run_script([
+        ("submit", data or {"impl": "code"}),    # 2.1 -> 2.2
+        ("submit", data or {"tests": "pass"}),   # 2.2 -> 2.3
+    ])
     assert h.step == "2.3 Compliance check"
 
 
+# Per-iteration submissions for the 4-phase OAuth2 walkthrough
+_OAUTH2_PHASE_DATA = (
+    {
+        "impl": {
+            "files": ["oauth2/endpoints/authorize.py", "oauth2/models/auth_code.py"],
+            "summary": "GET /authorize with PKCE support, consent screen, auth code storage",
+        },
+        "tests": {
+            "file": "tests/test_authorize.py",
+            "passed": 12, "failed": 0,
+            "coverage": "91%",
+        },
+    },
+    {
+        "impl": {
+            "files": ["oauth2/endpoints/token.py", "oauth2/models/token.py"],
+            "summary": "POST /token with authorization_code and refresh_token grant types",
+        },
+        "tests": {
+            "file": "tests/test_token.py",
+            "passed": 18, "failed": 0,
+            "coverage": "89%",
+        },
+    },
+    {
+        "impl": {
+            "files": ["oauth2/middleware/bearer.py", "oauth2/introspection.py"],
+            "summary": "Bearer token validation middleware with JWT signature verification",
+        },
+        "tests": {
+            "file": "tests/test_bearer.py",
+            "passed": 10, "failed": 0,
+            "coverage": "94%",
+        },
+    },
+    {
+        "impl": {
+            "files": ["oauth2/endpoints/revoke.py"],
+            "summary": "POST /revoke per RFC 7009, invalidates access and refresh tokens",
+        },
+        "tests": {
+            "file": "tests/test_revoke.py",
+            "passed": 6, "failed": 0,
+            "coverage": "97%",
+        },
+    },
+)
+
+
 # ===============================================================
 # Scenario 1: Four phases complete (original)
 # ===============================================================
@@ -69,20 +185,21 @@ def test_four_phases_complete(harness_factory):
     r = h.start()
     assert r
 
-    assert h.step == "1.1 Write specification"
-    assert h.status == "waiting"
+    h.assert_state(step="1.1 Write specification", status="waiting")
 
     # Wait step arrival: submit is rejected
     r = h.submit({})
     assert not r
-    assert "waiting" in r.message.lower()
+    assert r.code is RejectCode.WAITING
 
     # Approve the specification
     r = h.approve()
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
-    assert h.status == "running"
+    h.assert_state(
+        r,
+        new_step="1.2 Generate implementation plan",
+        step="1.2 Generate implementation plan",
+        status="running",
+    )
 
     r = h.submit({
         "plan": "4-phase implementation of OAuth2 Authorization Server",
@@ -94,86 +211,27 @@ def test_four_phases_complete(harness_factory):
         ],
         "tech_stack": "Python + FastAPI + SQLAlchemy + PyJWT",
     })
-    assert r
-    assert r.new_step == "1.3 Plan review"
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(r, new_step="1.3 Plan review", step="1.3 Plan review", status="waiting")
 
-    # WAIT+LLM: approve first, then submit_goto
+    # WAIT+LLM: the two-call path, approve() then a separate submit_goto()
     r = h.approve()
-    assert r
-    assert h.step == "1.3 Plan review"
-    assert h.status == "running"
+    h.assert_state(r, step="1.3 Plan review", status="running")
 
     r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase", status="running")
 
-    # Verify loop first entry
-    status = h.get_status()
-    assert "[1/" in status["display_path"]
-
-    # Phase implementation data for each iteration
-    phase_data = [
-        {
-            "impl": {
-                "files": ["oauth2/endpoints/authorize.py", "oauth2/models/auth_code.py"],
-                "summary": "GET /authorize with PKCE support, consent screen, auth code storage",
-            },
-            "tests": {
-                "file": "tests/test_authorize.py",
-                "passed": 12, "failed": 0,
-                "coverage": "91%",
-            },
-        },
-        {
-            "impl": {
-                "files": ["oauth2/endpoints/token.py", "oauth2/models/token.py"],
-                "summary": "POST /token with authorization_code and refresh_token grant types",
-            },
-            "tests": {
-                "file": "tests/test_token.py",
-                "passed": 18, "failed": 0,
-                "coverage": "89%",
-            },
-        },
-        {
-            "impl": {
-                "files": ["oauth2/middleware/bearer.py", "oauth2/introspection.py"],
-                "summary": "Bearer token validation middleware with JWT signature verification",
-            },
-            "tests": {
-                "file": "tests/test_bearer.py",
-                "passed": 10, "failed": 0,
-                "coverage": "94%",
-            },
-        },
-        {
-            "impl": {
-                "files": ["oauth2/endpoints/revoke.py"],
-                "summary": "POST /revoke per RFC 7009, invalidates access and refresh tokens",
-            },
-            "tests": {
-                "file": "tests/test_revoke.py",
-                "passed": 6, "failed": 0,
-                "coverage": "97%",
-            },
-        },
-    ]
+    # Verify loop first entry, and how the position is rendered
+    assert h.loop_iter_index("2.0 Phase loop") == 0
+    assert h.get_status()["display_path"] == "2.0 Phase loop[1/4] > 2.1 Implement phase"
 
     for i in range(4):
-        r = h.submit(phase_data[i]["impl"])
-        assert r
-        assert r.new_step == "2.2 Run phase tests"
-        assert h.step == "2.2 Run phase tests"
-        assert h.status == "running"
+        r = h.submit(_OAUTH2_PHASE_DATA[i]["impl"])
+        h.assert_state(
+            r, new_step="2.2 Run phase tests", step="2.2 Run phase tests", status="running"
+        )
 
-        r = h.submit(phase_data[i]["tests"])
-        assert r
-        assert h.step == "2.3 Compliance check"
-        assert h.status == "running"
+        r = h.submit(_OAUTH2_PHASE_DATA[i]["tests"])
+        h.assert_state(r, step="2.3 Compliance check", status="running")
 
         r = h.submit_goto("2.0 Phase loop")
         assert r
@@ -181,11 +239,10 @@ def test_four_phases_complete(harness_factory):
             assert r.new_step == "2.1 Implement phase"
             assert h.step == "2.1 Implement phase"
             # Verify iteration count
-            status = h.get_status()
-            assert f"[{i + 2}/" in status["display_path"]
+            assert h.loop_iter_index("2.0 Phase loop") == i + 1
+            assert f"2.0 Phase loop[{i + 2}/4]" in h.get_status()["display_path"]
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
     # Verify loop_state is cleaned up
     assert "2.0 Phase loop" not in h.state.loop_state
@@ -195,19 +252,15 @@ def test_four_phases_complete(harness_factory):
         "scenarios": ["full auth code flow", "token refresh cycle", "revocation cascade"],
         "passed": 46, "failed": 0,
     })
-    assert r
-    assert h.step == "3.2 Final verification"
-    assert h.status == "running"
+    h.assert_state(r, step="3.2 Final verification", status="running")
 
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
     # Verify done state: further submits rejected
     r = h.submit({})
     assert not r
-    assert "completed" in r.message.lower() or "Workflow is already completed" in r.message
+    assert r.code is RejectCode.DONE
 
 
 def test_code_not_conforming(harness_factory):
@@ -217,9 +270,9 @@ def test_code_not_conforming(harness_factory):
     assert r
 
     r = h.approve()
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
+    h.assert_state(
+        r, new_step="1.2 Generate implementation plan", step="1.2 Generate implementation plan"
+    )
 
     r = h.submit({
         "plan": "Implement JWT signing per RFC 7519 Section 7.1",
@@ -229,18 +282,11 @@ def test_code_not_conforming(harness_factory):
             "alg header MUST match the key type",
         ],
     })
-    assert r
-    assert r.new_step == "1.3 Plan review"
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(r, new_step="1.3 Plan review", step="1.3 Plan review", status="waiting")
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase", status="running")
 
     # Attempt 1: missing nbf claim
     r = h.submit({
@@ -252,13 +298,9 @@ def test_code_not_conforming(harness_factory):
         "passed": 8, "failed": 1,
         "failure": "test_nbf_claim_present: AssertionError: 'nbf' not in token claims",
     })
-    assert r
-    assert h.step == "2.3 Compliance check"
+    h.assert_state(r, step="2.3 Compliance check")
     r = h.submit_goto("2.1 Implement phase")
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase", status="running")
 
     # Attempt 2: nbf fixed but alg header says RS256 when using ES256 key
     r = h.submit({
@@ -270,13 +312,9 @@ def test_code_not_conforming(harness_factory):
         "passed": 9, "failed": 1,
         "failure": "test_es256_alg_header: alg='RS256' but key is EC P-256",
     })
-    assert r
-    assert h.step == "2.3 Compliance check"
+    h.assert_state(r, step="2.3 Compliance check")
     r = h.submit_goto("2.1 Implement phase")
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase", status="running")
 
     # Attempt 3: all compliance checks pass
     r = h.submit({
@@ -290,9 +328,7 @@ def test_code_not_conforming(harness_factory):
     })
     assert r
     r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(r, step="3.1 Integration testing", status="running")
 
     # Verify loop_state is cleaned up
     assert "2.0 Phase loop" not in h.state.loop_state
@@ -316,13 +352,9 @@ def test_spec_has_issues(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase", status="running")
 
     # Phase 1 (queries): implement and test
     r = h.submit({
@@ -348,40 +380,34 @@ def test_spec_has_issues(harness_factory):
         "passed": 8, "failed": 3,
         "failures": "Pagination tests fail: spec contradicts itself on offset vs cursor",
     })
-    assert r
-    assert h.step == "2.3 Compliance check"
+    h.assert_state(r, step="2.3 Compliance check")
 
     # Spec issue discovered mid-phase2, jump back to spec
     r = h.submit_goto("1.1 Write specification")
-    assert r
-    assert r.new_step == "1.1 Write specification"
-    assert h.step == "1.1 Write specification"
-    assert h.status == "waiting"
+    h.assert_state(
+        r, new_step="1.1 Write specification", step="1.1 Write specification", status="waiting"
+    )
 
     # Rewrite spec to use cursor-based pagination everywhere
     r = h.approve()
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
-    assert h.status == "running"
+    h.assert_state(
+        r,
+        new_step="1.2 Generate implementation plan",
+        step="1.2 Generate implementation plan",
+        status="running",
+    )
 
     r = h.submit({
         "plan": "Updated plan: cursor-based pagination for ALL list endpoints (Sections 3.2, 5.1 unified)",
     })
-    assert r
-    assert r.new_step == "1.3 Plan review"
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(r, new_step="1.3 Plan review", step="1.3 Plan review", status="waiting")
 
     # WAIT+LLM again
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
+    r = h.approve_and_goto("2.0 Phase loop")
     assert r
     # Loop state still has i=1, n=2 from before.
     # _handle_loop increments i from 1 to 2, which equals n=2, so loop exits.
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
     # Verify loop_state is cleaned up
     assert "2.0 Phase loop" not in h.state.loop_state
@@ -390,13 +416,10 @@ def test_spec_has_issues(harness_factory):
         "command": "pytest tests/integration/ -v",
         "passed": 22, "failed": 0,
     })
-    assert r
-    assert h.step == "3.2 Final verification"
+    h.assert_state(r, step="3.2 Final verification")
 
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
 
 def test_plan_review_rejected(harness_factory):
@@ -406,52 +429,44 @@ def test_plan_review_rejected(harness_factory):
     assert r
 
     r = h.approve()
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
+    h.assert_state(
+        r, new_step="1.2 Generate implementation plan", step="1.2 Generate implementation plan"
+    )
 
     # Plan V1: no audit trail
     r = h.submit({
         "plan": "Simple role-based access: User -> Role -> Permission mapping",
         "missing": "No audit trail for permission changes",
     })
-    assert r
-    assert r.new_step == "1.3 Plan review"
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(r, new_step="1.3 Plan review", step="1.3 Plan review", status="waiting")
 
-    # WAIT+LLM: approve first, then submit_goto -- rejected
+    # WAIT+LLM: the two-call path, approve() then a separate submit_goto() -- rejected
     r = h.approve()
-    assert r
-    assert h.step == "1.3 Plan review"
-    assert h.status == "running"
+    h.assert_state(r, step="1.3 Plan review", status="running")
 
     r = h.submit_goto("1.2 Generate implementation plan")
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
-    assert h.status == "running"
+    h.assert_state(
+        r,
+        new_step="1.2 Generate implementation plan",
+        step="1.2 Generate implementation plan",
+        status="running",
+    )
 
     # Plan V2: added audit but wrong granularity (role-level instead of permission-level)
     r = h.submit({
         "plan": "RBAC with audit trail: role assignments logged, but checks at role level only",
         "missing": "Spec requires permission-level checks, not role-level",
     })
-    assert r
-    assert r.new_step == "1.3 Plan review"
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(r, new_step="1.3 Plan review", step="1.3 Plan review", status="waiting")
 
     # Back at 1.3 Plan review (waiting again) -- rejected again
     r = h.approve()
-    assert r
-    assert h.step == "1.3 Plan review"
-    assert h.status == "running"
+    h.assert_state(r, step="1.3 Plan review", status="running")
 
     r = h.submit_goto("1.2 Generate implementation plan")
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
+    h.assert_state(
+        r, new_step="1.2 Generate implementation plan", step="1.2 Generate implementation plan"
+    )
 
     # Plan V3: audit trail + permission-level granularity
     r = h.submit({
@@ -465,13 +480,8 @@ def test_plan_review_rejected(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase", status="running")
 
 
 def test_mid_spec_update_stop_resume(harness_factory):
@@ -486,10 +496,8 @@ def test_mid_spec_update_stop_resume(harness_factory):
         "plan": "Implement AES-256-GCM encryption per NIST SP 800-38D",
     })
     assert r
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
     assert r
     r = h.submit({
         "files": ["crypto/aes_gcm.py"],
@@ -497,8 +505,7 @@ def test_mid_spec_update_stop_resume(harness_factory):
     })
     assert r
 
-    assert h.step == "2.2 Run phase tests"
-    assert h.status == "running"
+    h.assert_state(step="2.2 Run phase tests", status="running")
 
     # Security team mandates: all crypto code must have code review before testing
     r = h.stop()
@@ -507,51 +514,7 @@ def test_mid_spec_update_stop_resume(harness_factory):
     assert h.status == "stopped"
     assert h.step == "2.2 Run phase tests"
 
-    modified_yaml = """name: SDD Development
-description: Spec-Driven Development with code review
-
-steps:
-  - 1.1 Write specification:
-      type: wait
-
-  - 1.2 Generate implementation plan
-
-  - 1.3 Plan review:
-      type: wait
-      next:
-        - if: "plan is approved"
-          go: 2.0 Phase loop
-        - go: 1.2 Generate implementation plan
-
-  - 2.0 Phase loop:
-      iterate: "phases"
-      children:
-        - 2.1 Implement phase
-        - 2.1b Code review
-        - 2.2 Run phase tests
-        - 2.3 Compliance check:
-            next:
-              - if: "implementation conforms to spec"
-                go: 2.0 Phase loop
-              - if: "implementation does not conform, code needs fixes"
-                go: 2.1 Implement phase
-              - if: "spec itself has issues"
-                go: 1.1 Write specification
-
-  - 3.1 Integration testing
-
-  - 3.2 Final verification:
-      next:
-        - if: "all phases conform to spec"
-          go: Done
-        - go: 2.0 Phase loop
-
-  - Done:
-      type: terminate
-      reason: All phases conform to specification
-"""
-
-    h.reload_yaml(modified_yaml)
+    h.reload_yaml(_SDD_WITH_CODE_REVIEW_YAML)
 
     # 2.2 is NOT a wait step, so resume sets "running"
     r = h.resume()
@@ -578,33 +541,23 @@ def test_skip_phase(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase", status="running")
 
     # Phase 1: handshake -- implement it
     r = h.submit({
         "files": ["ws/handshake.py"],
         "summary": "HTTP Upgrade with Sec-WebSocket-Key validation per RFC 6455 Section 4",
     })
-    assert r
-    assert r.new_step == "2.2 Run phase tests"
-    assert h.step == "2.2 Run phase tests"
+    h.assert_state(r, new_step="2.2 Run phase tests", step="2.2 Run phase tests")
 
     # Skip testing handshake -- already validated with Autobahn test suite externally
     r = h.skip("Handshake validated by Autobahn|Testsuite (external compliance tool)")
-    assert r
-    assert h.step == "2.3 Compliance check"
-    assert h.status == "running"
+    h.assert_state(r, step="2.3 Compliance check", status="running")
 
     r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase")
 
     # Phase 2: framing -- full implementation and testing
     r = h.submit({
@@ -620,8 +573,7 @@ def test_skip_phase(harness_factory):
     r = h.submit_goto("2.0 Phase loop")
     assert r
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
     # Verify loop_state is cleaned up
     assert "2.0 Phase loop" not in h.state.loop_state
@@ -630,13 +582,10 @@ def test_skip_phase(harness_factory):
         "command": "pytest tests/integration/test_websocket.py -v",
         "passed": 31, "failed": 0,
     })
-    assert r
-    assert h.step == "3.2 Final verification"
+    h.assert_state(r, step="3.2 Final verification")
 
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
 
 def test_empty_phase_list(harness_factory):
@@ -657,14 +606,11 @@ def test_empty_phase_list(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
     assert r
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
 
 def test_back(harness_factory):
@@ -674,24 +620,23 @@ def test_back(harness_factory):
     assert r
 
     r = h.approve()
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
+    h.assert_state(
+        r, new_step="1.2 Generate implementation plan", step="1.2 Generate implementation plan"
+    )
 
     # Realize spec needs clarification on message ordering guarantees -- go back
     r = h.back()
-    assert r
-    assert r.new_step == "1.1 Write specification"
-    assert h.step == "1.1 Write specification"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="1.1 Write specification", step="1.1 Write specification", status="running"
+    )
 
     # 1.1 is a wait step but back() sets status to "running"
     r = h.submit({
         "spec_update": "Added Section 4.3: Messages MUST be delivered in FIFO order per partition",
     })
-    assert r
-    assert r.new_step == "1.2 Generate implementation plan"
-    assert h.step == "1.2 Generate implementation plan"
+    h.assert_state(
+        r, new_step="1.2 Generate implementation plan", step="1.2 Generate implementation plan"
+    )
 
     r = h.submit({
         "plan": "Message publish with partition-level FIFO ordering, WAL for durability",
@@ -700,27 +645,19 @@ def test_back(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase")
 
     r = h.submit({
         "files": ["mq/publisher.py", "mq/partition.py"],
         "summary": "Partition-aware publisher with WAL append",
     })
-    assert r
-    assert r.new_step == "2.2 Run phase tests"
-    assert h.step == "2.2 Run phase tests"
+    h.assert_state(r, new_step="2.2 Run phase tests", step="2.2 Run phase tests")
 
     # Realize the partition logic is wrong, go back
     r = h.back()
-    assert r
-    assert r.new_step == "2.1 Implement phase"
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.1 Implement phase", step="2.1 Implement phase", status="running")
 
     r = h.submit({
         "files_modified": ["mq/partition.py"],
@@ -732,17 +669,13 @@ def test_back(harness_factory):
     r = h.submit_goto("2.0 Phase loop")
     assert r
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
     r = h.submit({"passed": 22, "failed": 0})
-    assert r
-    assert h.step == "3.2 Final verification"
+    h.assert_state(r, step="3.2 Final verification")
 
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
 
 def test_done_then_reset(harness_factory):
@@ -757,10 +690,8 @@ def test_done_then_reset(harness_factory):
         "plan": "V1: Standard DNS resolver per RFC 1035 (UDP/TCP, A/AAAA/CNAME records)",
     })
     assert r
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
     assert r
     r = h.submit({
         "files": ["dns/resolver.py", "dns/packet.py"],
@@ -772,32 +703,27 @@ def test_done_then_reset(harness_factory):
     r = h.submit_goto("2.0 Phase loop")
     assert r
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
     r = h.submit({"passed": 24, "failed": 0})
-    assert r
-    assert h.step == "3.2 Final verification"
+    h.assert_state(r, step="3.2 Final verification")
 
     r = h.submit_goto("Done")
     assert r
 
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(step="Done", status="done")
 
     # Verify done state: further submits rejected
     r = h.submit({})
     assert not r
-    assert "completed" in r.message.lower() or "Workflow is already completed" in r.message
+    assert r.code is RejectCode.DONE
 
     # V1 shipped. Reset for V2: add DNS-over-HTTPS per RFC 8484
     h.reset()
     assert h.state is None
 
     r = h.start()
-    assert r
-    assert h.step == "1.1 Write specification"
-    assert h.status == "waiting"
+    h.assert_state(r, step="1.1 Write specification", status="waiting")
 
 
 def test_goto_integration(harness_factory):
@@ -817,33 +743,25 @@ def test_goto_integration(harness_factory):
     assert r.new_step == "1.3 Plan review"
     assert h.status == "waiting"
 
-    # WAIT+LLM: approve first, then submit_goto
-    r = h.approve()
-    assert r
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
+    # WAIT+LLM: approve and choose the next step in one call
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase")
 
     # Both phases were already implemented and unit-tested offline -- jump to integration
     r = h.goto("3.1 Integration testing")
-    assert r
-    assert r.new_step == "3.1 Integration testing"
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Integration testing", step="3.1 Integration testing", status="running"
+    )
 
     r = h.submit({
         "command": "pytest tests/integration/test_tls13.py -v",
         "scenarios": ["full handshake with ECDHE", "0-RTT early data", "session resumption"],
         "passed": 34, "failed": 0,
     })
-    assert r
-    assert h.step == "3.2 Final verification"
-    assert h.status == "running"
+    h.assert_state(r, step="3.2 Final verification", status="running")
 
     r = h.submit_goto("Done")
-    assert r
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(r, step="Done", status="done")
 
 
 # ===============================================================
@@ -873,10 +791,9 @@ def test_data_accumulates_plan(harness_factory):
     assert data["1.2 Generate implementation plan"]["plan"] == "3-phase plan"
 
 
-def test_data_accumulates_through_loop(harness_factory):
+def test_data_accumulates_through_loop(at_phase_loop):
     """Data submitted in loop iterations persists in state.data."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1"])
 
     h.submit({"impl": "auth module"})
     data = h.state.data
@@ -899,8 +816,7 @@ def test_history_audit_full_walkthrough(harness_factory):
     h.start()
     h.approve()
     h.submit({})
-    h.approve()
-    h.submit_goto("2.0 Phase loop")
+    h.approve_and_goto("2.0 Phase loop")
     h.submit({})
     h.submit({})
     h.submit_goto("2.0 Phase loop")
@@ -923,23 +839,17 @@ def test_history_records_goto(harness_factory):
     h.start()
     h.goto("3.1 Integration testing")
 
-    history = h.get_history(10)
-    actions = [e["action"] for e in history]
-    assert "goto" in actions
+    assert h.history_has("goto")
 
 
-def test_history_records_skip(harness_factory):
+def test_history_records_skip(at_phase_loop):
     """Skip reason appears in history."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1"])
     h.submit({})
     assert h.step == "2.2 Run phase tests"
 
     h.skip("already tested")
-    history = h.get_history(10)
-    skip_entries = [e for e in history if e["action"] == "skip"]
-    assert len(skip_entries) >= 1
-    assert skip_entries[0]["data"] == "already tested"
+    assert h.last_of("skip")["data"] == "already tested"
 
 
 def test_history_records_reject(harness_factory):
@@ -948,10 +858,7 @@ def test_history_records_reject(harness_factory):
     _walk_to_plan_review(h)
 
     h.reject("plan incomplete")
-    history = h.get_history(10)
-    reject_entries = [e for e in history if e["action"] == "reject"]
-    assert len(reject_entries) >= 1
-    assert reject_entries[0]["data"] == "plan incomplete"
+    assert h.last_of("reject")["data"] == "plan incomplete"
 
 
 # ===============================================================
@@ -965,45 +872,38 @@ def test_cross_executor_at_plan_review(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "1.3 Plan review"
-    assert h.status == "waiting"
+    h.assert_state(step="1.3 Plan review", status="waiting")
 
-    h.approve()
-    r = h.submit_goto("2.0 Phase loop")
-    assert r
-    assert h.step == "2.1 Implement phase"
+    r = h.approve_and_goto("2.0 Phase loop")
+    h.assert_state(r, step="2.1 Implement phase")
 
 
-def test_cross_executor_mid_loop(harness_factory):
+def test_cross_executor_mid_loop(at_phase_loop):
     """Close executor mid-loop, reopen, loop_state preserved."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["a", "b"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["a", "b"])
 
     h.submit({"impl": "a_code"})
     assert h.step == "2.2 Run phase tests"
 
     h.new_executor()
 
-    assert h.step == "2.2 Run phase tests"
-    assert h.status == "running"
+    h.assert_state(step="2.2 Run phase tests", status="running")
     loop_info = h.state.loop_state.get("2.0 Phase loop")
     assert loop_info is not None
     assert loop_info["i"] == 0
     assert loop_info["n"] == 2
 
 
-def test_cross_executor_at_integration(harness_factory):
+def test_cross_executor_at_integration(at_phase_loop):
     """Close executor at integration, reopen, continue."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1"])
     _do_one_phase_pass(h)
     h.submit_goto("2.0 Phase loop")
     assert h.step == "3.1 Integration testing"
 
     h.new_executor()
 
-    assert h.step == "3.1 Integration testing"
-    assert h.status == "running"
+    h.assert_state(step="3.1 Integration testing", status="running")
 
 
 def test_cross_executor_at_done(harness_factory):
@@ -1016,24 +916,21 @@ def test_cross_executor_at_done(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(step="Done", status="done")
     r = h.submit({})
     assert not r
 
 
-def test_cross_executor_stop_resume(harness_factory):
+def test_cross_executor_stop_resume(at_phase_loop):
     """Stop, close executor, reopen, resume."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1"])
 
     h.stop()
     assert h.status == "stopped"
 
     h.new_executor()
 
-    assert h.step == "2.1 Implement phase"
-    assert h.status == "stopped"
+    h.assert_state(step="2.1 Implement phase", status="stopped")
 
     r = h.resume()
     assert r
@@ -1044,84 +941,58 @@ def test_cross_executor_stop_resume(harness_factory):
 # Node validation tests
 # ===============================================================
 
-def test_node_validates_implementation(harness_factory):
-    """Validate node rejects bad data at 2.1, accepts good data."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
-
-    h.register_node(
-        "2.1 Implement phase",
-        NodeDefinition(
-            types=["validate"],
-            check=lambda data: True if data.get("impl") else "must include implementation",
-        ),
-    )
-
-    r = h.submit({"notes": "no impl"})
-    assert not r
-    assert "rejected" in r.message.lower()
-
-    r = h.submit({"impl": "auth_module.py"})
-    assert r
-    assert r.new_step == "2.2 Run phase tests"
+def _at_plan(h):
+    h.start()
+    h.approve()
 
 
-def test_node_validates_tests(harness_factory):
-    """Validate node rejects missing test data at 2.2."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
+def _at_phase_tests(h):
     _enter_phase_loop(h)
     h.submit({"impl": "code"})
-    assert h.step == "2.2 Run phase tests"
 
-    h.register_node(
-        "2.2 Run phase tests",
-        NodeDefinition(
-            types=["validate"],
-            check=lambda data: True if data.get("result") else "must include test result",
-        ),
-    )
 
-    r = h.submit({})
-    assert not r
-    assert "rejected" in r.message.lower()
-
-    r = h.submit({"result": "all pass"})
-    assert r
-    assert r.new_step == "2.3 Compliance check"
-
-
-def test_node_validates_plan(harness_factory):
-    """Validate node rejects bad plan data at 1.2."""
+@pytest.mark.parametrize(
+    ("walk", "step", "field", "bad", "good", "next_step"),
+    [
+        (_enter_phase_loop, "2.1 Implement phase", "impl",
+         {"notes": "no impl"}, {"impl": "auth_module.py"}, "2.2 Run phase tests"),
+        (_at_phase_tests, "2.2 Run phase tests", "result",
+         {}, {"result": "all pass"}, "2.3 Compliance check"),
+        (_at_plan, "1.2 Generate implementation plan", "plan",
+         {}, {"plan": "detailed 3-phase plan"}, "1.3 Plan review"),
+    ],
+    ids=["implementation", "tests", "plan"],
+)
+def test_node_validates(harness_factory, walk, step, field, bad, good, next_step):
+    """Validate node rejects data missing its required field, accepts good data."""
     h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    h.start()
-    h.approve()
-    assert h.step == "1.2 Generate implementation plan"
+    walk(h)
+    assert h.step == step
 
     h.register_node(
-        "1.2 Generate implementation plan",
+        step,
         NodeDefinition(
             types=["validate"],
-            check=lambda data: True if data.get("plan") else "must include plan",
+            check=lambda data: True if data.get(field) else f"must include {field}",
         ),
     )
 
-    r = h.submit({})
+    r = h.submit(bad)
     assert not r
-    assert "rejected" in r.message.lower()
+    assert r.code is RejectCode.VALIDATION_FAILED
 
-    r = h.submit({"plan": "detailed 3-phase plan"})
+    r = h.submit(good)
     assert r
-    assert r.new_step == "1.3 Plan review"
+    assert r.new_step == next_step
 
 
 # ===============================================================
 # Node archival tests
 # ===============================================================
 
-def test_node_archives_implementation(harness_factory):
+def test_node_archives_implementation(at_phase_loop):
     """Archive node writes implementation data to SQLite."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1"])
 
     h.register_node(
         "2.1 Implement phase",
@@ -1142,10 +1013,9 @@ def test_node_archives_implementation(harness_factory):
     assert rows[0]["phase"] == "phase1"
 
 
-def test_node_archives_per_iteration(harness_factory):
+def test_node_archives_per_iteration(at_phase_loop):
     """Archive node accumulates one row per loop iteration."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1", "p2", "p3"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["p1", "p2", "p3"])
 
     h.register_node(
         "2.1 Implement phase",
@@ -1199,12 +1069,11 @@ def test_submit_on_waiting_fails(harness_factory):
     """Submit while waiting returns failure."""
     h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
     h.start()
-    assert h.step == "1.1 Write specification"
-    assert h.status == "waiting"
+    h.assert_state(step="1.1 Write specification", status="waiting")
 
     r = h.submit({"data": "should fail"})
     assert not r
-    assert "waiting" in r.message.lower()
+    assert r.code is RejectCode.WAITING
 
 
 def test_approve_on_running_fails(harness_factory):
@@ -1212,12 +1081,11 @@ def test_approve_on_running_fails(harness_factory):
     h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
     h.start()
     h.approve()
-    assert h.step == "1.2 Generate implementation plan"
-    assert h.status == "running"
+    h.assert_state(step="1.2 Generate implementation plan", status="running")
 
     r = h.approve()
     assert not r
-    assert "not waiting" in r.message.lower()
+    assert r.code is RejectCode.NOT_WAITING
 
 
 def test_reject_on_running_fails(harness_factory):
@@ -1229,7 +1097,7 @@ def test_reject_on_running_fails(harness_factory):
 
     r = h.reject("should fail")
     assert not r
-    assert "not waiting" in r.message.lower()
+    assert r.code is RejectCode.NOT_WAITING
 
 
 def test_submit_on_stopped_fails(harness_factory):
@@ -1241,7 +1109,7 @@ def test_submit_on_stopped_fails(harness_factory):
 
     r = h.submit({"data": "should fail"})
     assert not r
-    assert "stopped" in r.message.lower()
+    assert r.code is RejectCode.STOPPED
 
 
 def test_submit_on_done_fails(harness_factory):
@@ -1254,6 +1122,7 @@ def test_submit_on_done_fails(harness_factory):
 
     r = h.submit({})
     assert not r
+    assert r.code is RejectCode.DONE
 
 
 def test_stop_on_done_fails(harness_factory):
@@ -1266,6 +1135,7 @@ def test_stop_on_done_fails(harness_factory):
 
     r = h.stop()
     assert not r
+    assert r.code is RejectCode.DONE
 
 
 def test_stop_on_stopped_fails(harness_factory):
@@ -1278,6 +1148,7 @@ def test_stop_on_stopped_fails(harness_factory):
 
     r = h.stop()
     assert not r
+    assert r.code is RejectCode.STOPPED
 
 
 def test_resume_on_non_stopped_fails(harness_factory):
@@ -1289,6 +1160,7 @@ def test_resume_on_non_stopped_fails(harness_factory):
 
     r = h.resume()
     assert not r
+    assert r.code is RejectCode.NOT_STOPPED
 
 
 # ===============================================================
@@ -1305,8 +1177,7 @@ def test_checkpoint_save_and_load(harness_factory):
 
     h.save_checkpoint("at_plan_review")
 
-    h.approve()
-    h.submit_goto("2.0 Phase loop")
+    h.approve_and_goto("2.0 Phase loop")
     assert h.step == "2.1 Implement phase"
 
     restored = h.load_checkpoint("at_plan_review")
@@ -1315,6 +1186,18 @@ def test_checkpoint_save_and_load(harness_factory):
     assert "1.2 Generate implementation plan" in restored.data
 
 
+def test_reopened_state_db_uses_wal(harness_factory):
+    """A reopened executor keeps state.db in WAL mode with its checkpoints."""
+    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
+    h.start()
+    h.save_checkpoint("at_spec")
+
+    h.new_executor()
+    db = h.executor.state_manager.db
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert h.load_checkpoint("at_spec").current_step == "1.1 Write specification"
+
+
 def test_retry_stays_at_current(harness_factory):
     """Retry keeps the workflow at the current step."""
     h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["p1"]})
@@ -1323,9 +1206,7 @@ def test_retry_stays_at_current(harness_factory):
     assert h.step == "1.2 Generate implementation plan"
 
     r = h.retry()
-    assert r
-    assert h.step == "1.2 Generate implementation plan"
-    assert h.status == "running"
+    h.assert_state(r, step="1.2 Generate implementation plan", status="running")
 
     history = h.get_history(5)
     actions = [e["action"] for e in history]
@@ -1339,7 +1220,7 @@ def test_goto_nonexistent_step(harness_factory):
 
     r = h.goto("99.99 Does not exist")
     assert not r
-    assert "not found" in r.message.lower()
+    assert r.code is RejectCode.STEP_NOT_FOUND
 
 
 def test_submit_with_invalid_goto_target(harness_factory):
@@ -1351,7 +1232,7 @@ def test_submit_with_invalid_goto_target(harness_factory):
 
     r = h.submit({"_goto": "99.99 Nonexistent"})
     assert not r
-    assert "not found" in r.message.lower()
+    assert r.code is RejectCode.STEP_NOT_FOUND
 
 
 def test_back_at_start_fails(harness_factory):
@@ -1361,7 +1242,7 @@ def test_back_at_start_fails(harness_factory):
 
     r = h.back()
     assert not r
-    assert "cannot go back" in r.message.lower()
+    assert r.code is RejectCode.NO_HISTORY
 
 
 def test_multiple_resets(harness_factory):
@@ -1394,10 +1275,9 @@ def test_reset_clears_history(harness_factory):
     assert len(history_after) == 0
 
 
-def test_loop_counter_increments(harness_factory):
+def test_loop_counter_increments(at_phase_loop):
     """Loop index increments after each iteration."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["a", "b", "c"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["a", "b", "c"])
 
     loop_info = h.state.loop_state["2.0 Phase loop"]
     assert loop_info["i"] == 0
@@ -1406,20 +1286,17 @@ def test_loop_counter_increments(harness_factory):
     _do_one_phase_pass(h)
     h.submit_goto("2.0 Phase loop")
 
-    loop_info = h.state.loop_state["2.0 Phase loop"]
-    assert loop_info["i"] == 1
+    assert h.loop_iter_index("2.0 Phase loop") == 1
 
     _do_one_phase_pass(h)
     h.submit_goto("2.0 Phase loop")
 
-    loop_info = h.state.loop_state["2.0 Phase loop"]
-    assert loop_info["i"] == 2
+    assert h.loop_iter_index("2.0 Phase loop") == 2
 
 
-def test_loop_cleanup_on_exit(harness_factory):
+def test_loop_cleanup_on_exit(at_phase_loop):
     """Loop state is cleaned up after all iterations complete."""
-    h = harness_factory("p1-sdd.yaml", loop_data={"phases": ["only"]})
-    _enter_phase_loop(h)
+    h = at_phase_loop(["only"])
 
     _do_one_phase_pass(h)
     h.submit_goto("2.0 Phase loop")
@@ -1446,9 +1323,9 @@ def test_history_records_transition(harness_factory):
     h.approve()
     h.submit({})
 
-    history = h.get_history(20)
-    transition_entries = [e for e in history if e["action"] == "transition"]
+    transition_entries = h.get_history(20, action="transition")
     assert len(transition_entries) >= 1
+    assert all(e["action"] == "transition" for e in transition_entries)
 
 
 def test_node_instructions_in_status(harness_factory):
@@ -1457,8 +1334,7 @@ def test_node_instructions_in_status(harness_factory):
     h.start()
     h.approve()
     h.submit({})
-    h.approve()
-    h.submit_goto("2.0 Phase loop")
+    h.approve_and_goto("2.0 Phase loop")
     assert h.step == "2.1 Implement phase"
 
     h.register_node(
@@ -34,16 +34,14 @@ def _walk_to_spike_eval(h):
     h.start()
     h.submit({"goals": "validate caching approach"})
     h.submit({"prototype": "cache_poc.py"})
-    assert h.step == "1.3 Spike evaluation"
-    assert h.status == "running"
+    h.assert_state(step="1.3 Spike evaluation", status="running")
 
 
 def _enter_dev_loop(h):
     """Common helper: get past spike into dev loop iteration 1."""
     _walk_to_spike_eval(h)
     h.submit_goto("2.0 Development loop")
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(step="2.1 Implement feature", status="running")
 
 
 def _do_one_dev_pass(h, data=None):
@@ -62,74 +60,54 @@ def test_spike_pass_then_develop(harness_factory):
     """Real-time collaboration: spike WebSocket viability, then build cursor sync and live editing."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["cursor_sync", "live_editing"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
-    assert h.status == "running"
+    h.assert_state(r, step="1.1 Define spike goals", status="running")
 
     # Spike phase: validate WebSocket approach for real-time collab
-    r = h.submit({
+    h.submit_expect({
         "goals": "Validate WebSocket for sub-100ms cursor sync between 50+ concurrent editors",
         "hypothesis": "WebSocket with binary frames can handle 50+ users at <100ms latency",
         "success_criteria": "P95 latency < 100ms with 50 simulated clients",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
-    assert h.status == "running"
+    }, step="1.2 Build prototype", status="running")
 
-    r = h.submit({
+    h.submit_expect({
         "prototype": "spike/ws_collab_poc.py",
         "stack": "Python asyncio + websockets library",
         "benchmark": "P95 latency 42ms with 50 clients, 180 cursor updates/sec",
         "conclusion": "WebSocket approach is viable, proceed to formal development",
-    })
-    assert r
-    assert r.new_step == "1.3 Spike evaluation"
-    assert h.step == "1.3 Spike evaluation"
-    assert h.status == "running"
+    }, step="1.3 Spike evaluation", status="running")
 
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     # Verify loop state initialized
     status = h.get_status()
     assert "[1/" in status["display_path"]
 
     # Feature 1: Cursor synchronization
-    r = h.submit({
+    h.submit_expect({
         "feature": "cursor_sync",
         "files": ["collab/cursor_manager.py", "collab/ws_handler.py"],
         "summary": "Broadcast cursor position via WS binary frames, debounce at 60fps",
-    })
-    assert r
-    assert r.new_step == "2.2 Write tests"
-    assert h.step == "2.2 Write tests"
-    assert h.status == "running"
+    }, step="2.2 Write tests", status="running")
 
-    r = h.submit({
+    h.submit_expect({
         "test_file": "tests/test_cursor_sync.py",
         "test_count": 8,
         "notable": ["test_50_clients_latency_under_100ms", "test_cursor_debounce_60fps"],
-    })
-    assert r
-    assert r.new_step == "2.3 Run tests"
-    assert h.step == "2.3 Run tests"
-    assert h.status == "running"
+    }, step="2.3 Run tests", status="running")
 
-    r = h.submit({"passed": 8, "failed": 0, "coverage": "89%"})
-    assert r
-    assert r.new_step == "2.4 Feature quality check"
-    assert h.step == "2.4 Feature quality check"
-    assert h.status == "running"
+    h.submit_expect(
+        {"passed": 8, "failed": 0, "coverage": "89%"},
+        step="2.4 Feature quality check",
+        status="running",
+    )
 
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     # Verify second iteration
     status = h.get_status()
@@ -148,25 +126,22 @@ def test_spike_pass_then_develop(harness_factory):
     })
     assert r
     r = h.submit({"passed": 12, "failed": 0, "coverage": "91%"})
-    assert r
-    assert h.step == "2.4 Feature quality check"
+    h.assert_state(r, step="2.4 Feature quality check")
 
     r = h.submit_goto("2.0 Development loop")
     assert r
     # Loop exhausted -> moves to after-loop step
     assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(step="3.1 Demo to stakeholder", status="waiting")
 
     # Verify loop state cleaned up
     assert "2.0 Development loop" not in h.state.loop_state
 
     # WAIT+LLM: approve first, then submit_goto
     r = h.approve()
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="running"
+    )
 
     r = h.submit_goto("Done")
     assert r
@@ -177,88 +152,60 @@ def test_spike_rejected_pivot(harness_factory):
     """Image processing pipeline: SQLite rejected (too slow), Redis rejected (no persistence), PostgreSQL wins."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["image_pipeline"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
-    assert h.status == "running"
+    h.assert_state(r, step="1.1 Define spike goals", status="running")
 
     # First spike attempt: SQLite for job queue
-    r = h.submit({
+    h.submit_expect({
         "goals": "Find a job queue backend for image processing pipeline (100 jobs/sec, durable)",
         "approach_1": "SQLite as job queue with polling",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
+    }, step="1.2 Build prototype")
 
-    r = h.submit({
+    h.submit_expect({
         "prototype": "spike/sqlite_queue.py",
         "result": "Handles 12 jobs/sec -- too slow (need 100/sec), write contention on WAL",
-    })
-    assert r
-    assert r.new_step == "1.3 Spike evaluation"
-    assert h.step == "1.3 Spike evaluation"
+    }, step="1.3 Spike evaluation")
 
     # SQLite too slow -- pivot
     r = h.submit_goto("1.4 Pivot approach")
-    assert r
-    assert r.new_step == "1.4 Pivot approach"
-    assert h.step == "1.4 Pivot approach"
-    assert h.status == "running"
+    h.assert_state(r, new_step="1.4 Pivot approach", step="1.4 Pivot approach", status="running")
 
-    r = h.submit({
+    h.submit_expect({
         "pivot_reason": "SQLite maxes out at 12 jobs/sec due to single-writer lock",
         "new_approach": "Redis Streams as job queue",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
-    assert h.status == "running"
+    }, step="1.2 Build prototype", status="running")
 
     # Second spike attempt: Redis Streams
-    r = h.submit({
+    h.submit_expect({
         "prototype": "spike/redis_queue.py",
         "result": "250 jobs/sec but Redis is in-memory only -- jobs lost on restart",
-    })
-    assert r
-    assert r.new_step == "1.3 Spike evaluation"
-    assert h.step == "1.3 Spike evaluation"
+    }, step="1.3 Spike evaluation")
 
     # Redis not durable enough -- pivot again
     r = h.submit_goto("1.4 Pivot approach")
-    assert r
-    assert r.new_step == "1.4 Pivot approach"
-    assert h.step == "1.4 Pivot approach"
+    h.assert_state(r, new_step="1.4 Pivot approach", step="1.4 Pivot approach")
 
-    r = h.submit({
+    h.submit_expect({
         "pivot_reason": "Redis Streams fast but not durable without AOF (adds latency)",
         "new_approach": "PostgreSQL SKIP LOCKED as job queue",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
+    }, step="1.2 Build prototype")
 
     # Third spike attempt: PostgreSQL SKIP LOCKED -- works!
-    r = h.submit({
+    h.submit_expect({
         "prototype": "spike/pg_queue.py",
         "result": "145 jobs/sec with SKIP LOCKED, fully durable, ACID guarantees",
-    })
-    assert r
-    assert r.new_step == "1.3 Spike evaluation"
-    assert h.step == "1.3 Spike evaluation"
+    }, step="1.3 Spike evaluation")
 
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
 
 def test_three_rejections_then_stop(harness_factory):
     """PDF renderer: 3 quality rejections (font rendering bugs), team stops to re-evaluate approach."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["pdf_renderer"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
+    h.assert_state(r, step="1.1 Define spike goals")
 
     # Get through spike phase
     r = h.submit({
@@ -271,9 +218,7 @@ def test_three_rejections_then_stop(harness_factory):
     })
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
+    h.assert_state(r, new_step="2.1 Implement feature", step="2.1 Implement feature")
 
     # Attempt 1: font metrics off by 2px
     r = h.submit({
@@ -284,14 +229,12 @@ def test_three_rejections_then_stop(harness_factory):
     r = h.submit({"test_file": "tests/test_renderer.py", "count": 10})
     assert r
     r = h.submit({"passed": 7, "failed": 3, "failures": "test_font_metrics_*"})
-    assert r
-    assert h.step == "2.4 Feature quality check"
+    h.assert_state(r, step="2.4 Feature quality check")
 
     r = h.submit_goto("2.1 Implement feature")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     # Attempt 2: fixed metrics but ligatures broken
     r = h.submit({
@@ -303,9 +246,7 @@ def test_three_rejections_then_stop(harness_factory):
     r = h.submit({"passed": 9, "failed": 2, "failures": "test_ligatures_*"})
     assert r
     r = h.submit_goto("2.1 Implement feature")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
+    h.assert_state(r, new_step="2.1 Implement feature", step="2.1 Implement feature")
 
     # Attempt 3: ligatures fixed but right-to-left text broken
     r = h.submit({
@@ -315,8 +256,7 @@ def test_three_rejections_then_stop(harness_factory):
     r = h.submit({"added_tests": ["test_rtl_arabic", "test_rtl_hebrew"]})
     assert r
     r = h.submit({"passed": 10, "failed": 2, "failures": "test_rtl_*"})
-    assert r
-    assert h.step == "2.4 Feature quality check"
+    h.assert_state(r, step="2.4 Feature quality check")
 
     # Team decides to stop and re-evaluate the Cairo approach
     r = h.stop()
@@ -333,8 +273,7 @@ def test_dev_loop_stop_resume(harness_factory):
     """Search engine spike: stop after indexing feature for holiday break, resume with ranking."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["indexer", "ranker"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
+    h.assert_state(r, step="1.1 Define spike goals")
 
     # Get to dev loop
     r = h.submit({
@@ -362,10 +301,9 @@ def test_dev_loop_stop_resume(harness_factory):
     r = h.submit({"passed": 14, "failed": 0})
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     # Holiday break -- stop workflow
     r = h.stop()
@@ -391,18 +329,16 @@ def test_dev_loop_stop_resume(harness_factory):
     r = h.submit({"passed": 10, "failed": 0})
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="waiting"
+    )
 
 
 def test_skip_spike_direct_dev(harness_factory):
     """Caching layer: team already validated Redis in previous project, skip eval and start coding."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["cache_layer"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
+    h.assert_state(r, step="1.1 Define spike goals")
 
     r = h.submit({
         "goals": "Validate Redis caching for API response memoization",
@@ -411,36 +347,29 @@ def test_skip_spike_direct_dev(harness_factory):
     assert r
     assert r.new_step == "1.2 Build prototype"
 
-    r = h.submit({
+    h.submit_expect({
         "prototype": "spike/redis_cache_poc.py",
         "result": "Cache hit ratio 94%, P99 latency 3ms -- as expected from prior experience",
-    })
-    assert r
-    assert r.new_step == "1.3 Spike evaluation"
-    assert h.step == "1.3 Spike evaluation"
+    }, step="1.3 Spike evaluation")
 
     # Team already knows Redis works -- skip evaluation, go straight to development
     r = h.goto("2.1 Implement feature")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
 
 def test_goto_dev_loop(harness_factory):
     """Email templating: spike done externally, goto development loop to build production version."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["template_engine"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
-    assert h.status == "running"
+    h.assert_state(r, step="1.1 Define spike goals", status="running")
 
     # Spike was done in a separate branch -- jump directly to development
     r = h.goto("2.1 Implement feature")
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     r = h.submit({
         "feature": "template_engine",
@@ -458,10 +387,9 @@ def test_goto_dev_loop(harness_factory):
 
     # Use goto to reach demo since loop counter was not initialized via the loop header
     r = h.goto("3.1 Demo to stakeholder")
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="running"
+    )
 
 
 def test_dev_wrong_direction_back_spike(harness_factory):
@@ -482,37 +410,28 @@ def test_dev_wrong_direction_back_spike(harness_factory):
     r = h.submit_goto("2.0 Development loop")
     assert r
 
-    r = h.submit({
+    h.submit_expect({
         "feature": "push_notifications",
         "files": ["notifications/fcm.py"],
         "summary": "Direct FCM HTTP v1 API calls per device",
-    })
-    assert r
-    assert r.new_step == "2.2 Write tests"
-    assert h.step == "2.2 Write tests"
-    assert h.status == "running"
+    }, step="2.2 Write tests", status="running")
 
     # Realize we should batch FCM calls, not per-device -- go back
     r = h.back()
-    assert r
-    assert r.new_step == "2.1 Implement feature"
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="2.1 Implement feature", step="2.1 Implement feature", status="running"
+    )
 
     # back from 2.1 -> the most recent different step in history before 2.1
     r = h.back()
-    assert r
-    assert r.new_step == "2.2 Write tests"
-    assert h.step == "2.2 Write tests"
-    assert h.status == "running"
+    h.assert_state(r, new_step="2.2 Write tests", step="2.2 Write tests", status="running")
 
 
 def test_done_reset_new_approach(harness_factory):
     """Video transcoding V1 shipped with FFmpeg, reset to spike GPU-accelerated approach for V2."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["transcode_api"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
+    h.assert_state(r, step="1.1 Define spike goals")
 
     # Quick path to done: V1 with CPU-based FFmpeg
     r = h.submit({
@@ -538,16 +457,14 @@ def test_done_reset_new_approach(harness_factory):
     r = h.submit({"passed": 9, "failed": 0})
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="waiting"
+    )
 
     r = h.approve()
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="running"
+    )
 
     r = h.submit_goto("Done")
     assert r
@@ -563,9 +480,7 @@ def test_done_reset_new_approach(harness_factory):
     assert h.state is None
 
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
-    assert h.status == "running"
+    h.assert_state(r, step="1.1 Define spike goals", status="running")
 
 
 def test_demo_reject_then_approve(harness_factory):
@@ -598,32 +513,24 @@ def test_demo_reject_then_approve(harness_factory):
     r = h.submit({"passed": 7, "failed": 0})
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="waiting"
+    )
 
     # Stakeholder rejects: "Need drill-down, real-time, and custom tooltips -- Chart.js too limited"
     r = h.approve()
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="running"
+    )
 
     r = h.submit_goto("1.4 Pivot approach")
-    assert r
-    assert r.new_step == "1.4 Pivot approach"
-    assert h.step == "1.4 Pivot approach"
-    assert h.status == "running"
+    h.assert_state(r, new_step="1.4 Pivot approach", step="1.4 Pivot approach", status="running")
 
     # Pivot to D3.js for full customization
-    r = h.submit({
+    h.submit_expect({
         "pivot_reason": "Chart.js lacks drill-down and custom interaction handlers",
         "new_approach": "D3.js with custom React wrapper for drill-down and real-time WebSocket updates",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
+    }, step="1.2 Build prototype")
 
     r = h.submit({
         "prototype": "spike/d3_dashboard.html",
@@ -646,17 +553,15 @@ def test_demo_reject_then_approve(harness_factory):
     r = h.submit({"passed": 12, "failed": 0})
     assert r
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="waiting"
+    )
 
     # Stakeholder approves: "This is exactly what we need"
     r = h.approve()
-    assert r
-    assert r.new_step == "3.1 Demo to stakeholder"
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="3.1 Demo to stakeholder", step="3.1 Demo to stakeholder", status="running"
+    )
 
     r = h.submit_goto("Done")
     assert r
@@ -667,16 +572,12 @@ def test_modify_yaml_add_spike_step(harness_factory):
     """Rate limiter spike: team adds a peer-review step for spike goals after realizing scope creep."""
     h = harness_factory("p1-spike.yaml", loop_data={"work_items": ["token_bucket"]})
     r = h.start()
-    assert r
-    assert h.step == "1.1 Define spike goals"
+    h.assert_state(r, step="1.1 Define spike goals")
 
-    r = h.submit({
+    h.submit_expect({
         "goals": "Spike token-bucket rate limiter for API gateway (10k req/sec per tenant)",
         "scope": "Single-node in-memory, Redis sync deferred to production phase",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
+    }, step="1.2 Build prototype")
 
     # Team realizes spike goals are too broad -- add a review step to YAML
     new_yaml = """name: Spike and Stabilize
@@ -725,20 +626,15 @@ steps:
 
     # Jump to new review step so team lead can narrow scope
     r = h.goto("1.15 Review spike goals")
-    assert r
-    assert r.new_step == "1.15 Review spike goals"
-    assert h.step == "1.15 Review spike goals"
-    assert h.status == "running"
+    h.assert_state(
+        r, new_step="1.15 Review spike goals", step="1.15 Review spike goals", status="running"
+    )
 
-    r = h.submit({
+    h.submit_expect({
         "review_notes": "Narrow spike to single-tenant token bucket only, defer multi-tenant",
         "revised_scope": "Token bucket for 1 tenant, fixed 10k/sec window, no Redis",
         "reviewer": "tech_lead",
-    })
-    assert r
-    assert r.new_step == "1.2 Build prototype"
-    assert h.step == "1.2 Build prototype"
-    assert h.status == "running"
+    }, step="1.2 Build prototype", status="running")
 
 
 # ===============================================================
@@ -873,12 +769,10 @@ def test_cross_executor_at_spike_eval(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "1.3 Spike evaluation"
-    assert h.status == "running"
+    h.assert_state(step="1.3 Spike evaluation", status="running")
 
     r = h.submit_goto("2.0 Development loop")
-    assert r
-    assert h.step == "2.1 Implement feature"
+    h.assert_state(r, step="2.1 Implement feature")
 
 
 def test_cross_executor_mid_dev_loop(harness_factory):
@@ -891,8 +785,7 @@ def test_cross_executor_mid_dev_loop(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "2.2 Write tests"
-    assert h.status == "running"
+    h.assert_state(step="2.2 Write tests", status="running")
     loop_info = h.state.loop_state.get("2.0 Development loop")
     assert loop_info is not None
     assert loop_info["i"] == 0
@@ -905,13 +798,11 @@ def test_cross_executor_at_demo(harness_factory):
     _enter_dev_loop(h)
     _do_one_dev_pass(h)
     h.submit_goto("2.0 Development loop")
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(step="3.1 Demo to stakeholder", status="waiting")
 
     h.new_executor()
 
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(step="3.1 Demo to stakeholder", status="waiting")
 
 
 def test_cross_executor_at_done(harness_factory):
@@ -924,8 +815,7 @@ def test_cross_executor_at_done(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "Done"
-    assert h.status == "done"
+    h.assert_state(step="Done", status="done")
     r = h.submit({})
     assert not r
 
@@ -940,8 +830,7 @@ def test_cross_executor_stop_resume(harness_factory):
 
     h.new_executor()
 
-    assert h.step == "2.1 Implement feature"
-    assert h.status == "stopped"
+    h.assert_state(step="2.1 Implement feature", status="stopped")
 
     r = h.resume()
     assert r
@@ -1126,8 +1015,7 @@ def test_submit_on_waiting_fails(harness_factory):
     _enter_dev_loop(h)
     _do_one_dev_pass(h)
     h.submit_goto("2.0 Development loop")
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(step="3.1 Demo to stakeholder", status="waiting")
 
     r = h.submit({"data": "should fail"})
     assert not r
@@ -1242,9 +1130,7 @@ def test_retry_stays_at_current(harness_factory):
     assert h.step == "1.1 Define spike goals"
 
     r = h.retry()
-    assert r
-    assert h.step == "1.1 Define spike goals"
-    assert h.status == "running"
+    h.assert_state(r, step="1.1 Define spike goals", status="running")
 
     history = h.get_history(5)
     actions = [e["action"] for e in history]
@@ -1350,8 +1236,7 @@ def test_reject_preserves_data(harness_factory):
     _enter_dev_loop(h)
     _do_one_dev_pass(h)
     h.submit_goto("2.0 Development loop")
-    assert h.step == "3.1 Demo to stakeholder"
-    assert h.status == "waiting"
+    h.assert_state(step="3.1 Demo to stakeholder", status="waiting")
 
     data_before = dict(h.state.data)
     h.reject("not ready")
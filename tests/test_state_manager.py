@@ -0,0 +1,269 @@
+"""Tests for StateManager (state.db persistence and its state cache)."""
+from __future__ import annotations
+
+import json
+import math
+from typing import TYPE_CHECKING
+
+import pytest
+
+from vibe_linter.store import state as state_module
+from vibe_linter.store.state import StateManager
+from vibe_linter.types import WorkflowState
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "state.db"
+
+
+@pytest.fixture
+def mgr(db_path: Path) -> Iterator[StateManager]:
+    m = StateManager(db_path)
+    m.init_state(WorkflowState(flow_name="f", current_step="a", data={"a": {"x": 1}}))
+    yield m
+    m.close()
+
+
+def test_reopened_db_uses_wal_and_normal_sync(db_path):
+    """state.db stays in WAL mode, and each connection syncs at NORMAL (1)."""
+    StateManager(db_path).close()
+    m = StateManager(db_path)
+    try:
+        assert m.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert m.db.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        m.close()
+
+
+def test_current_state_is_a_private_copy(mgr):
+    """Mutating a returned state does not leak into later reads."""
+    state = mgr.get_current_state()
+    state.data["injected"] = 1
+    state.data["a"]["x"] = 99
+    state.loop_state["loop"] = {"i": 0, "n": 1}
+
+    again = mgr.get_current_state()
+    assert again.data == {"a": {"x": 1}}
+    assert again.loop_state == {}
+    assert mgr.peek_state().data == {"a": {"x": 1}}
+
+
+def test_update_state_does_not_cache_caller_objects(mgr):
+    loop_state = {"loop": {"i": 0, "n": 2}}
+    data = {"a": {"x": 2}}
+    mgr.update_state(loop_state=loop_state, data=data)
+    loop_state["loop"]["i"] = 5
+    data["a"]["x"] = 99
+
+    state = mgr.peek_state()
+    assert state.loop_state == {"loop": {"i": 0, "n": 2}}
+    assert state.data == {"a": {"x": 2}}
+
+
+def test_history_limit_keeps_newest_rows(db_path):
+    m = StateManager(db_path, history_limit=10)
+    try:
+        counts = {}
+        for i in range(1, 311):
+            m.add_history("f", f"s{i}", "submit")
+            if i in (300, 309, 310):
+                counts[i] = len(m.get_history(limit=1000))
+        steps = {row["step_path"] for row in m.get_history(limit=1000)}
+    finally:
+        m.close()
+    # Trimmed every 10 inserts back to the newest 10, so never above 19 rows
+    assert counts == {300: 10, 309: 19, 310: 10}
+    assert steps == {f"s{i}" for i in range(301, 311)}
+
+
+def test_history_limit_trims_in_batches(db_path):
+    m = StateManager(db_path, history_limit=1000)
+    try:
+        for i in range(1, 1301):
+            m.add_history("f", f"s{i}", "submit")
+        count = len(m.get_history(limit=5000))
+    finally:
+        m.close()
+    # Last trim at insert 1280 kept 1000 rows; 20 were added since
+    assert count == 1020
+
+
+def test_history_unbounded_by_default(mgr):
+    for i in range(300):
+        mgr.add_history("f", f"s{i}", "submit")
+    assert len(mgr.get_history(limit=1000)) == 300
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_history_limit_below_one_rejected(db_path, limit):
+    with pytest.raises(ValueError, match="history_limit"):
+        StateManager(db_path, history_limit=limit)
+
+
+@pytest.mark.parametrize("reader", ["json", "orjson"])
+def test_json_fallback_values_round_trip(db_path, monkeypatch, reader):
+    """Rows encoded by the json fallback decode with or without orjson."""
+    if reader == "orjson":
+        pytest.importorskip("orjson")
+    value = {"nan": math.nan, "inf": math.inf, "big": 2**70}
+    with monkeypatch.context() as m:
+        m.setattr(state_module, "orjson", None)
+        writer = StateManager(db_path)
+        writer.init_state(WorkflowState(flow_name="f", current_step="a"))
+        writer.update_state(data={"a": value})
+        writer.close()
+    if reader == "json":
+        monkeypatch.setattr(state_module, "orjson", None)
+
+    m = StateManager(db_path)
+    try:
+        data = m.get_current_state().data["a"]
+    finally:
+        m.close()
+    assert math.isnan(data["nan"])
+    assert data["inf"] == math.inf
+    assert data["big"] == 2**70
+
+
+@pytest.mark.parametrize("use_orjson", [False, True], ids=["json", "orjson"])
+def test_non_finite_values_stored_the_same_with_and_without_orjson(db_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(state_module, "orjson", None)
+    m = StateManager(db_path)
+    try:
+        m.init_state(WorkflowState(flow_name="f", current_step="a"))
+        m.set_step_data("b", {"score": math.inf, "none": None})
+        m.invalidate_cache()
+        assert m.get_current_state().data == {"b": {"score": math.inf, "none": None}}
+
+        m.update_state(data={"a": {"nan": math.nan, "inf": [math.inf, -math.inf]}})
+        m.invalidate_cache()
+        data = m.get_current_state().data["a"]
+    finally:
+        m.close()
+    assert math.isnan(data["nan"])
+    assert data["inf"] == [math.inf, -math.inf]
+
+
+def test_set_step_data_non_finite_values(mgr, monkeypatch):
+    monkeypatch.setattr(state_module, "orjson", None)
+    mgr.set_step_data("b", {"score": math.inf})
+    mgr.set_step_data("c", {"n": 1})
+    mgr.invalidate_cache()
+    data = mgr.get_current_state().data
+    assert data == {"a": {"x": 1}, "b": {"score": math.inf}, "c": {"n": 1}}
+
+
+def test_checkpoint_non_finite_values(mgr, monkeypatch):
+    monkeypatch.setattr(state_module, "orjson", None)
+    mgr.update_state(data={"a": {"score": math.inf}})
+    mgr.save_checkpoint("cp")
+    restored = mgr.load_checkpoint("cp")
+    assert restored.data == {"a": {"score": math.inf}}
+    assert restored.current_step == "a"
+
+
+def test_unknown_status_row_raises_clear_error(mgr):
+    mgr.db.execute("UPDATE workflow_state SET status = 'paused' WHERE id = 1")
+    mgr.db.commit()
+    mgr.invalidate_cache()
+    with pytest.raises(ValueError, match=r"Unknown workflow status 'paused' \(expected one of: running"):
+        mgr.get_current_state()
+
+
+def test_nested_transaction_rolls_back_and_drops_cache(mgr):
+    with pytest.raises(RuntimeError, match="boom"), mgr.transaction():
+        mgr.update_state(current_step="b")
+        with mgr.transaction():
+            mgr.set_step_data("b", {"y": 2})
+            mgr.add_history("f", "b", "submit")
+        assert mgr.peek_state().current_step == "b"
+        raise RuntimeError("boom")
+
+    assert mgr._state is None
+    state = mgr.get_current_state()
+    assert state.current_step == "a"
+    assert state.data == {"a": {"x": 1}}
+    assert mgr.get_history() == []
+
+
+def test_inner_transaction_commits_with_outer(mgr, db_path):
+    other = StateManager(db_path)
+    try:
+        with mgr.transaction():
+            with mgr.transaction():
+                mgr.update_state(current_step="b")
+            # The inner block joined the outer one, so nothing is committed yet
+            assert other.get_current_state().current_step == "a"
+        assert other.get_current_state().current_step == "b"
+    finally:
+        other.close()
+
+
+def test_cache_invalidated_by_other_connection(mgr, db_path):
+    assert mgr.peek_state().current_step == "a"
+    other = StateManager(db_path)
+    try:
+        other.update_state(current_step="c", data={"c": 3})
+    finally:
+        other.close()
+
+    state = mgr.peek_state()
+    assert state.current_step == "c"
+    assert state.data == {"c": 3}
+
+
+def test_cache_kept_without_outside_writes(mgr):
+    first = mgr.peek_state()
+    assert mgr.peek_state() is first
+
+
+def test_set_step_data_quoted_step_name(mgr):
+    mgr.set_step_data('say "hi"', {"n": 1})
+    mgr.set_step_data("plain", {"n": 2})
+    assert mgr.peek_state().data == {"a": {"x": 1}, 'say "hi"': {"n": 1}, "plain": {"n": 2}}
+
+    mgr.invalidate_cache()
+    assert mgr.get_current_state().data == {"a": {"x": 1}, 'say "hi"': {"n": 1}, "plain": {"n": 2}}
+
+
+def test_insert_rows(mgr):
+    mgr.create_table("results", {"name": "string", "score": "number", "tags": "string[]"})
+    mgr.insert_rows("results", [
+        {"name": "a", "score": 1.5, "tags": ["x", "y"]},
+        {"name": "b", "score": 2, "tags": []},
+    ])
+    mgr.insert_rows("results", [])
+    mgr.insert_row("results", {"name": "c", "score": 3, "tags": ["z"]})
+
+    rows = mgr.db.execute("SELECT name, score, tags FROM results ORDER BY id").fetchall()
+    assert [(name, score, json.loads(tags)) for name, score, tags in rows] == [
+        ("a", 1.5, ["x", "y"]),
+        ("b", 2.0, []),
+        ("c", 3.0, ["z"]),
+    ]
+
+
+def test_current_state_after_set_step_data_is_a_private_copy(mgr):
+    mgr.peek_state()
+    mgr.set_step_data("b", {"y": [1]})
+    state = mgr.get_current_state()
+    state.data["b"]["y"].append(2)
+
+    assert mgr.get_current_state().data == {"a": {"x": 1}, "b": {"y": [1]}}
+    assert mgr.peek_state().data == {"a": {"x": 1}, "b": {"y": [1]}}
+
+
+def test_non_durable_connection_skips_sync(db_path):
+    m = StateManager(db_path, durable=False)
+    try:
+        assert m.db.execute("PRAGMA synchronous").fetchone()[0] == 0
+    finally:
+        m.close()
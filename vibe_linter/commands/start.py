@@ -5,6 +5,7 @@ import sys
 from pathlib import Path
 
 from vibe_linter.engine import Executor
+from vibe_linter.types import Status
 
 
 def cmd_start(cwd: str):
@@ -20,12 +21,12 @@ def cmd_start(cwd: str):
     try:
         # Check if resuming from stopped state
         state = executor.state_manager.get_current_state()
-        if state and state.status == "stopped" and state.flow_name == flow_name:
-            executor.state_manager.update_state(status="running")
+        if state and state.status == Status.STOPPED and state.flow_name == flow_name:
+            executor.state_manager.update_state(status=Status.RUNNING)
             executor.state_manager.add_history(flow_name, state.current_step, "resume")
             step = executor._ensure_flow().steps.get(state.current_step)
             if step and step.config.get("wait"):
-                executor.state_manager.update_state(status="waiting")
+                executor.state_manager.update_state(status=Status.WAITING)
             print(f'Flow "{flow_name}" resumed at step: {state.current_step}')
         else:
             print(executor.start(flow_name))
@@ -4,6 +4,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from vibe_linter.store.state import StateManager
+from vibe_linter.types import Status
 
 
 def cmd_stop(cwd: str):
@@ -21,15 +22,15 @@ def cmd_stop(cwd: str):
             print("No active workflow to stop.")
             return
 
-        if state.status == "stopped":
+        if state.status == Status.STOPPED:
             print(f'Workflow "{state.flow_name}" is already stopped.')
             return
 
-        if state.status == "done":
+        if state.status == Status.DONE:
             print(f'Workflow "{state.flow_name}" is already completed.')
             return
 
-        mgr.update_state(status="stopped")
+        mgr.update_state(status=Status.STOPPED)
         mgr.add_history(state.flow_name, state.current_step, "stop")
         print(f'Workflow "{state.flow_name}" stopped (was at: {state.current_step}).')
         print("All edit constraints removed. Run `vibe start` to resume.")
@@ -1,10 +1,15 @@
 """Parse YAML workflow definitions into a transition graph."""
 from __future__ import annotations
 
-import yaml
+import functools
+import sys
+from typing import TYPE_CHECKING, Any
 
 from vibe_linter.types import FlowDefinition, StepDefinition, Transition
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 # Chinese keyword -> internal key mapping
 KEYWORD_MAP = {
     "步骤": "steps",
@@ -196,8 +201,19 @@ def _parse_explicit_transitions(next_def, transitions: list[Transition]) -> None
                 transitions.append(Transition(target=item))
 
 
+@functools.cache
+def _yaml_load() -> Callable[[str], Any]:
+    """Import PyYAML on first parse, so commands that never parse a flow skip it.
+
+    Prefers the LibYAML-backed loader; PyYAML wheels without it fall back to pure Python.
+    """
+    import yaml
+
+    return functools.partial(yaml.load, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
 def parse_flow_yaml(content: str) -> FlowDefinition:
-    raw = yaml.safe_load(content)
+    raw = _yaml_load()(content)
     if not isinstance(raw, dict):
         raise ValueError("Invalid YAML: expected a mapping")
 
@@ -221,6 +237,7 @@ def parse_flow_yaml(content: str) -> FlowDefinition:
 
     steps: dict[str, StepDefinition] = {}
     _process_steps(raw_steps, steps)
+    steps = _intern_names(steps)
 
     entry = next(iter(steps)) if steps else ""
     return FlowDefinition(name=name, description=description, steps=steps, entry=entry)
@@ -239,3 +256,23 @@ def _collect_all_names(raw_steps: list) -> list[str]:
         if isinstance(children, list):
             names.extend(_collect_all_names(children))
     return names
+
+
+def _intern_names(steps: dict[str, StepDefinition]) -> dict[str, StepDefinition]:
+    """Intern step names and transition targets.
+
+    Names are compared and used as dict keys on every transition; interning
+    lets those lookups short-circuit on identity.
+    """
+    interned: dict[str, StepDefinition] = {}
+    for name, step in steps.items():
+        name = _intern(name)
+        step.name = name
+        for t in step.transitions:
+            t.target = _intern(t.target)
+        interned[name] = step
+    return interned
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
@@ -1,3 +1,3 @@
-from vibe_linter.engine.executor import Executor, SubmitResult
+from vibe_linter.engine.executor import Executor, RejectCode, SubmitResult
 
-__all__ = ["Executor", "SubmitResult"]
+__all__ = ["Executor", "RejectCode", "SubmitResult"]
@@ -8,17 +8,24 @@ Condition evaluation has three modes:
 from __future__ import annotations
 
 import contextlib
+import functools
 import json
 import re
+import sys
 from datetime import UTC, datetime
+from enum import Enum
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from vibe_linter.compiler.parser import parse_flow_yaml
-from vibe_linter.engine.expression import evaluate_condition, evaluate_expression
+from vibe_linter.engine.expression import compile_condition, evaluate_expression
 from vibe_linter.engine.node_loader import get_node, load_nodes
-from vibe_linter.store.state import StateManager
-from vibe_linter.types import FlowDefinition, StepDefinition, Transition, WorkflowState
+from vibe_linter.store.state import HISTORY_LIMIT, StateManager
+from vibe_linter.types import FlowDefinition, Status, StepDefinition, Transition, WorkflowState
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
 
 # ─── Condition classification ───
 
@@ -41,43 +48,209 @@ def _classify_condition(condition: str) -> str:
     return "llm"
 
 
-def _eval_node_condition(condition: str, data: dict[str, Any]) -> bool:
-    """Evaluate an @node("eval") condition."""
-    node_name = condition.strip().lstrip("@")
+def _eval_node(node_name: str, data: dict[str, Any]) -> bool:
+    """Evaluate an @node("eval") condition by node name."""
     node_def = get_node(node_name)
     if node_def and node_def.check:
+        # data is the shared cached state; node checks must only read it
         result = node_def.check(data)
         return result is True
     return False
 
 
+def _compile_check(ctype: str, condition: str) -> Callable[[dict[str, Any], dict[str, Any]], bool]:
+    """Compile a programmatic condition into a predicate over (context, state.data).
+
+    Expressions are parsed once; eval nodes are still looked up per call so
+    that node (re)registration takes effect immediately.
+    """
+    if ctype == "expression":
+        test = compile_condition(condition)
+        return lambda ctx, data: test(ctx)
+    node_name = condition.strip().lstrip("@")
+    return lambda ctx, data: _eval_node(node_name, data)
+
+
+# ─── Transition dispatch ───
+
+class _StepDispatch:
+    """Transitions of one step, classified once when the flow is loaded."""
+
+    def __init__(self, step: StepDefinition):
+        # (compiled predicate, target) for expression / eval_node transitions
+        checks: list[tuple[Callable[[dict[str, Any], dict[str, Any]], bool], str]] = []
+        # Target of the first unconditional transition, if any
+        self.default_target: str | None = None
+        for t in step.transitions:
+            if t.condition is None:
+                if self.default_target is None:
+                    self.default_target = t.target
+                continue
+            ctype = _classify_condition(t.condition)
+            if ctype != "llm":
+                checks.append((_compile_check(ctype, t.condition), t.target))
+        self.checks = tuple(checks)
+        self.decisions = _collect_llm_decisions(step.transitions)
+        # Step kind flags, read on every move instead of looking up step.config
+        self.wait = bool(step.config.get("wait"))
+        self.terminate = bool(step.config.get("terminate"))
+        self.is_loop = "iterate" in step.config
+        # Loop headers: first child, and the step after the loop (None if last)
+        self.loop_body: str | None = None
+        self.loop_exit: str | None = None
+        if self.is_loop and step.transitions:
+            self.loop_body = step.transitions[0].target
+            if len(step.transitions) > 1:
+                self.loop_exit = step.transitions[1].target
+        # Iterate steps always auto-advance; auto steps only if no LLM condition
+        self.auto_advance = bool(step.config.get("iterate")) or (
+            bool(step.config.get("auto")) and not self.decisions
+        )
+
+
+def _compile_dispatch(flow: FlowDefinition) -> dict[str, _StepDispatch]:
+    return {name: _StepDispatch(step) for name, step in flow.steps.items()}
+
+
+def _freeze_flow(flow: FlowDefinition) -> None:
+    """Replace the flow's containers with read-only views so it can be shared."""
+    for step in flow.steps.values():
+        step.transitions = tuple(step.transitions)
+        step.config = MappingProxyType(step.config)
+    flow.steps = MappingProxyType(flow.steps)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_flow(content: str) -> tuple[FlowDefinition, Mapping[str, _StepDispatch], str]:
+    """Parse and compile a flow once per distinct YAML text.
+
+    Returns the flow, its dispatch table and the comma-joined step names used
+    in "not found" messages. Keyed by content, so an edited file is always
+    re-parsed. The returned objects are shared between executors, so their
+    containers are frozen.
+    """
+    flow = parse_flow_yaml(content)
+    _freeze_flow(flow)
+    return flow, MappingProxyType(_compile_dispatch(flow)), ", ".join(flow.steps)
+
+
 # ─── Result type ───
 
+class RejectCode(str, Enum):
+    """Why an operation was refused; set on failed SubmitResults."""
+
+    DONE = "done"
+    STOPPED = "stopped"
+    WAITING = "waiting"
+    NOT_WAITING = "not_waiting"
+    NOT_STOPPED = "not_stopped"
+    STEP_NOT_FOUND = "step_not_found"
+    VALIDATION_FAILED = "validation_failed"
+    ARCHIVE_FAILED = "archive_failed"
+    NO_TRANSITION = "no_transition"
+    NO_HISTORY = "no_history"
+
+    def __str__(self) -> str:
+        return self.value
+
+
 class SubmitResult:
-    def __init__(self, success: bool, message: str, new_step: str | None = None):
+    __slots__ = ("code", "message", "new_step", "success")
+
+    def __init__(
+        self,
+        success: bool,
+        message: str,
+        new_step: str | None = None,
+        code: RejectCode | None = None,
+    ):
         self.success = success
         self.message = message
         self.new_step = new_step
+        self.code = code
 
     def __bool__(self) -> bool:
         return self.success
 
     def to_dict(self) -> dict:
-        return {"success": self.success, "message": self.message, "new_step": self.new_step}
+        return {
+            "success": self.success,
+            "message": self.message,
+            "new_step": self.new_step,
+            "code": self.code,
+        }
+
+
+# Shared, read-only results for failures whose message never varies
+_SUBMIT_DONE = SubmitResult(
+    False,
+    "Workflow is already completed. Use vibe_goto to jump to a step if you need to revisit.",
+    code=RejectCode.DONE,
+)
+_SUBMIT_STOPPED = SubmitResult(
+    False,
+    "Workflow is stopped. Run `vibe start` to resume before submitting.",
+    code=RejectCode.STOPPED,
+)
+_STOP_DONE = SubmitResult(False, "Workflow already completed.", code=RejectCode.DONE)
+_STOP_STOPPED = SubmitResult(False, "Workflow already stopped.", code=RejectCode.STOPPED)
+_BACK_NO_HISTORY = SubmitResult(
+    False, "Cannot go back — no previous step in history.", code=RejectCode.NO_HISTORY
+)
+
+_NO_WORKFLOW = "No active workflow. Run `vibe start` first."
+
+# get_status()'s allowed_actions, per status
+_ALLOWED_ACTIONS: Mapping[Status, tuple[str, ...]] = MappingProxyType({
+    status: (
+        ("submit", "skip", "approve", "reject", "back", "goto", "retry")
+        if status is Status.WAITING
+        else ("submit", "skip", "back", "goto", "retry")
+    )
+    for status in Status
+})
+
+
+_M = TypeVar("_M", bound="Callable[..., Any]")
+
+
+def _transactional(method: _M) -> _M:
+    """Commit every write made by an Executor method together, or none of them.
+
+    E.g. a submit's archive row, step data, history and transition; an
+    approve's status change and the submit it runs.
+    """
+    @functools.wraps(method)
+    def wrapper(self: Executor, *args: Any, **kwargs: Any) -> Any:
+        with self.state_manager.transaction():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 # ─── Executor ───
 
 class Executor:
-    def __init__(self, vibe_dir: str | Path):
+    def __init__(
+        self,
+        vibe_dir: str | Path,
+        history_limit: int | None = HISTORY_LIMIT,
+        *,
+        durable: bool = True,
+    ):
         self.vibe_dir = Path(vibe_dir)
-        self.state_manager = StateManager(self.vibe_dir / "state.db")
+        # Long-running workflows keep only the newest history_limit history rows
+        self.state_manager = StateManager(
+            self.vibe_dir / "state.db", history_limit, durable=durable
+        )
         self.flow: FlowDefinition | None = None
+        self._dispatch: Mapping[str, _StepDispatch] = {}
+        self._available_steps = ""
 
+    @_transactional
     def start(self, flow_name: str, initial_data: dict[str, Any] | None = None) -> str:
-        flow_path = self.vibe_dir / "flows" / f"{flow_name}.yaml"
-        self.flow = parse_flow_yaml(flow_path.read_text(encoding="utf-8"))
-        self._load_nodes()
+        # Re-read the YAML and node files every time, so edits made since the
+        # last start() take effect; an unchanged YAML is a _compile_flow cache hit.
+        self._load_flow(flow_name)
 
         if not self.flow.steps:
             raise ValueError("Flow has no steps")
@@ -86,7 +259,7 @@ class Executor:
         state = WorkflowState(
             flow_name=flow_name,
             current_step=entry,
-            status="running",
+            status=Status.RUNNING,
             data=dict(initial_data or {}),
             started_at=datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
         )
@@ -99,22 +272,20 @@ class Executor:
             result = self._auto_advance()
             return f'Flow "{self.flow.name}" started → {result.message}'
 
-        if step.config.get("wait"):
-            self.state_manager.update_state(status="waiting")
+        if self._dispatch[entry].wait:
+            self.state_manager.update_state(status=Status.WAITING)
 
         return f'Flow "{self.flow.name}" started, current step: {entry}'
 
     def get_status(self) -> dict[str, Any]:
-        state = self._require_state()
+        # A caller-owned state, so its data can go into the result as-is
+        state = self.state_manager.get_current_state()
+        if not state:
+            raise RuntimeError(_NO_WORKFLOW)
         flow = self._ensure_flow()
         step = flow.steps.get(state.current_step)
         node_def = get_node(state.current_step) if step else None
 
-        allowed = ["submit", "skip"]
-        if state.status == "waiting":
-            allowed.extend(["approve", "reject"])
-        allowed.extend(["back", "goto", "retry"])
-
         elapsed = _format_elapsed(state.started_at)
         history = self.state_manager.get_history(1)
         last_action = history[0] if history else None
@@ -128,13 +299,13 @@ class Executor:
             "status": state.status,
             "elapsed": elapsed,
             "last_action": last_action,
-            "allowed_actions": allowed,
+            "allowed_actions": list(_ALLOWED_ACTIONS[state.status]),
             "data": state.data,
         }
 
         # One-line summary
         summary_parts = [f"{flow.name} > {display_path}"]
-        if state.status == "waiting":
+        if state.status is Status.WAITING:
             summary_parts.append("waiting for approval")
         if elapsed:
             summary_parts.append(f"elapsed {elapsed}")
@@ -144,9 +315,9 @@ class Executor:
 
         # Pending LLM decisions — transitions Claude needs to evaluate
         if step:
-            decisions = _collect_llm_decisions(step.transitions)
+            decisions = self._dispatch[step.name].decisions
             if decisions:
-                result["pending_decisions"] = decisions
+                result["pending_decisions"] = [dict(d) for d in decisions]
                 result["decision_hint"] = (
                     "This step has conditions that require your judgment. "
                     "Evaluate the situation, then submit with {\"_goto\": \"step_name\"} "
@@ -154,31 +325,22 @@ class Executor:
                 )
 
         if node_def:
-            result["node"] = {
-                "name": node_def.name,
-                "types": node_def.types,
-                "instructions": node_def.instructions or None,
-                "edit_policy": node_def.edit_policy.__dict__ if node_def.edit_policy else None,
-            }
+            result["node"] = node_def.status_payload()
         return result
 
+    @_transactional
     def submit(self, data: dict[str, Any]) -> SubmitResult:
         state = self._require_state()
-        if state.status == "done":
-            return SubmitResult(
-                False,
-                "Workflow is already completed. Use vibe_goto to jump to a step if you need to revisit.",
-            )
-        if state.status == "stopped":
-            return SubmitResult(
-                False,
-                "Workflow is stopped. Run `vibe start` to resume before submitting.",
-            )
-        if state.status == "waiting":
+        if state.status is Status.DONE:
+            return _SUBMIT_DONE
+        if state.status is Status.STOPPED:
+            return _SUBMIT_STOPPED
+        if state.status is Status.WAITING:
             return SubmitResult(
                 False,
                 f'Step "{state.current_step}" is waiting for human approval. '
                 "Use vibe_approve to continue or vibe_reject to reject.",
+                code=RejectCode.WAITING,
             )
 
         flow = self._ensure_flow()
@@ -188,6 +350,7 @@ class Executor:
                 False,
                 f'Step "{state.current_step}" not found in flow definition. '
                 "The workflow YAML may have changed. Use vibe_goto to jump to a valid step.",
+                code=RejectCode.STEP_NOT_FOUND,
             )
 
         # Node validation + archival
@@ -200,6 +363,7 @@ class Executor:
                         False,
                         f'Output rejected by step "{step.name}": {check_result}. '
                         "Please fix the issues and resubmit.",
+                        code=RejectCode.VALIDATION_FAILED,
                     )
             if "archive" in node_def.types and node_def.archive:
                 try:
@@ -207,14 +371,15 @@ class Executor:
                         self.state_manager.create_table(node_def.archive["table"], node_def.schema["output"])
                     self.state_manager.insert_row(node_def.archive["table"], data)
                 except Exception as e:
-                    return SubmitResult(False, f"Failed to archive output: {e}")
+                    return SubmitResult(
+                        False, f"Failed to archive output: {e}", code=RejectCode.ARCHIVE_FAILED
+                    )
 
         # Explicit _goto — Claude chose a transition path
         goto_target = data.pop("_goto", None)
 
         # Store data and record
-        new_data = {**state.data, step.name: data}
-        self.state_manager.update_state(data=new_data)
+        self.state_manager.set_step_data(step.name, data)
         self.state_manager.add_history(
             state.flow_name, step.name, "submit", json.dumps(data, ensure_ascii=False)
         )
@@ -224,124 +389,149 @@ class Executor:
                 return SubmitResult(
                     False,
                     f'_goto target "{goto_target}" not found. '
-                    f"Available steps: {', '.join(flow.steps)}",
+                    f"Available steps: {self._available_steps}",
+                    code=RejectCode.STEP_NOT_FOUND,
                 )
             return self._move_to(goto_target)
 
         return self._follow_transitions(step)
 
+    @_transactional
     def skip(self, reason: str | None = None) -> SubmitResult:
         state = self._require_state()
         flow = self._ensure_flow()
         step = flow.steps.get(state.current_step)
         if not step:
-            return SubmitResult(False, f'Current step "{state.current_step}" not found in flow.')
+            return SubmitResult(
+                False,
+                f'Current step "{state.current_step}" not found in flow.',
+                code=RejectCode.STEP_NOT_FOUND,
+            )
         self.state_manager.add_history(state.flow_name, state.current_step, "skip", reason)
-        self.state_manager.update_state(status="running")
+        self.state_manager.update_state(status=Status.RUNNING)
         return self._follow_transitions(step)
 
+    @_transactional
     def retry(self) -> SubmitResult:
         state = self._require_state()
-        self.state_manager.update_state(status="running")
+        self.state_manager.update_state(status=Status.RUNNING)
         self.state_manager.add_history(state.flow_name, state.current_step, "retry")
         return SubmitResult(True, f'Retrying step "{state.current_step}". Please attempt it again.')
 
+    @_transactional
     def approve(self, data: dict[str, Any] | None = None) -> SubmitResult:
         state = self._require_state()
-        if state.status != "waiting":
-            return SubmitResult(
-                False,
-                f'Step "{state.current_step}" is not waiting for approval (status: {state.status}).',
-            )
-        self.state_manager.update_state(status="running")
+        if state.status is not Status.WAITING:
+            return _not_waiting(state)
+        self.state_manager.update_state(status=Status.RUNNING)
         self.state_manager.add_history(state.flow_name, state.current_step, "approve")
         return self.submit(data or {})
 
+    @_transactional
     def reject(self, reason: str | None = None) -> SubmitResult:
         state = self._require_state()
-        if state.status != "waiting":
-            return SubmitResult(
-                False,
-                f'Step "{state.current_step}" is not waiting for approval (status: {state.status}).',
-            )
+        if state.status is not Status.WAITING:
+            return _not_waiting(state)
         self.state_manager.add_history(state.flow_name, state.current_step, "reject", reason)
         return SubmitResult(True, f"Rejected: {reason or 'no reason given'}")
 
+    @_transactional
     def goto(self, target_name: str) -> SubmitResult:
         state = self._require_state()
         flow = self._ensure_flow()
-        if target_name not in flow.steps:
+        target = flow.steps.get(target_name)
+        if target is None:
             return SubmitResult(
                 False,
                 f'Step "{target_name}" not found. '
-                f"Available steps: {', '.join(flow.steps)}",
+                f"Available steps: {self._available_steps}",
+                code=RejectCode.STEP_NOT_FOUND,
             )
-        self.state_manager.update_state(current_step=target_name, status="running")
+        # Store the flow's interned name, not the caller's equal copy
+        target_name = target.name
+        self.state_manager.update_state(current_step=target_name, status=Status.RUNNING)
         self.state_manager.add_history(state.flow_name, target_name, "goto")
         return SubmitResult(True, f"Jumped to: {target_name}", target_name)
 
+    @_transactional
     def back(self) -> SubmitResult:
         state = self._require_state()
-        history = self.state_manager.get_history(20)
-        for entry in history:
-            if entry["step_path"] != state.current_step:
-                target = entry["step_path"]
-                self.state_manager.update_state(current_step=target, status="running")
+        for step_path in self.state_manager.iter_history_steps(20):
+            if step_path != state.current_step:
+                target = sys.intern(step_path)
+                self.state_manager.update_state(current_step=target, status=Status.RUNNING)
                 self.state_manager.add_history(state.flow_name, target, "back")
                 return SubmitResult(True, f"Moved back to: {target}", target)
-        return SubmitResult(False, "Cannot go back — no previous step in history.")
+        return _BACK_NO_HISTORY
 
+    @_transactional
     def stop(self) -> SubmitResult:
         state = self._require_state()
-        if state.status == "done":
-            return SubmitResult(False, "Workflow already completed.")
-        if state.status == "stopped":
-            return SubmitResult(False, "Workflow already stopped.")
-        self.state_manager.update_state(status="stopped")
+        if state.status is Status.DONE:
+            return _STOP_DONE
+        if state.status is Status.STOPPED:
+            return _STOP_STOPPED
+        self.state_manager.update_state(status=Status.STOPPED)
         self.state_manager.add_history(state.flow_name, state.current_step, "stop")
         return SubmitResult(True, f"Workflow stopped at: {state.current_step}")
 
+    @_transactional
     def resume(self) -> SubmitResult:
         state = self._require_state()
-        if state.status != "stopped":
-            return SubmitResult(False, f"Cannot resume: status is {state.status}.")
-        flow = self._ensure_flow()
-        step = flow.steps.get(state.current_step)
-        new_status = "waiting" if step and step.config.get("wait") else "running"
+        if state.status is not Status.STOPPED:
+            return SubmitResult(
+                False, f"Cannot resume: status is {state.status}.", code=RejectCode.NOT_STOPPED
+            )
+        self._ensure_flow()
+        dispatch = self._dispatch.get(state.current_step)
+        new_status = Status.WAITING if dispatch and dispatch.wait else Status.RUNNING
         self.state_manager.update_state(status=new_status)
         self.state_manager.add_history(state.flow_name, state.current_step, "resume")
         return SubmitResult(True, f"Resumed at: {state.current_step}", state.current_step)
 
-    def get_history(self, limit: int = 20) -> list[dict]:
-        return self.state_manager.get_history(limit)
+    def get_history(self, limit: int = 20, action: str | None = None) -> list[dict]:
+        return self.state_manager.get_history(limit, action)
+
+    def iter_history(self, limit: int = 20, action: str | None = None) -> Iterator[dict]:
+        return self.state_manager.iter_history(limit, action)
 
     def get_data(self) -> dict[str, Any]:
         state = self.state_manager.get_current_state()
         return state.data if state else {}
 
+    def reset(self) -> None:
+        """Clear workflow state and history."""
+        self.state_manager.reset()
+
     def close(self) -> None:
         self.state_manager.close()
 
     # ─── Private ───
 
     def _require_state(self) -> WorkflowState:
-        state = self.state_manager.get_current_state()
+        """The shared cached state; read-only (see StateManager.peek_state)."""
+        state = self.state_manager.peek_state()
         if not state:
-            raise RuntimeError("No active workflow. Run `vibe start` first.")
+            raise RuntimeError(_NO_WORKFLOW)
         return state
 
     def _load_nodes(self) -> None:
         with contextlib.suppress(Exception):
             load_nodes(self.vibe_dir / "nodes")
 
+    def _load_flow(self, flow_name: str) -> FlowDefinition:
+        flow_path = self.vibe_dir / "flows" / f"{flow_name}.yaml"
+        self.flow, self._dispatch, self._available_steps = _compile_flow(
+            flow_path.read_text(encoding="utf-8")
+        )
+        self._load_nodes()
+        return self.flow
+
     def _ensure_flow(self) -> FlowDefinition:
         if self.flow:
             return self.flow
         state = self._require_state()
-        flow_path = self.vibe_dir / "flows" / f"{state.flow_name}.yaml"
-        self.flow = parse_flow_yaml(flow_path.read_text(encoding="utf-8"))
-        self._load_nodes()
-        return self.flow
+        return self._load_flow(state.flow_name)
 
     def _build_display_path(self, state: WorkflowState) -> str:
         parts: list[str] = []
@@ -359,34 +549,22 @@ class Executor:
 
     def _should_auto_advance(self, step: StepDefinition) -> bool:
         """Can this step auto-advance without waiting for input?"""
-        if step.config.get("iterate"):
-            return True
-        if not step.config.get("auto"):
-            return False
-        # Auto step, but only if all conditions are programmatic (no LLM)
-        return all(
-            t.condition is None or _classify_condition(t.condition) != "llm"
-            for t in step.transitions
-        )
+        return self._dispatch[step.name].auto_advance
 
     def _follow_transitions(self, step: StepDefinition) -> SubmitResult:
         """Evaluate transitions: programmatic first, then LLM, then default."""
         state = self._require_state()
         self._ensure_flow()
+        dispatch = self._dispatch[step.name]
         ctx = self._build_context(state)
 
         # Pass 1: try programmatic conditions (expression + eval_node)
-        for t in step.transitions:
-            if t.condition is None:
-                continue
-            ctype = _classify_condition(t.condition)
-            if ctype == "expression" and evaluate_condition(t.condition, ctx):
-                return self._move_to(t.target)
-            if ctype == "eval_node" and _eval_node_condition(t.condition, state.data):
-                return self._move_to(t.target)
+        for test, target in dispatch.checks:
+            if test(ctx, state.data):
+                return self._move_to(target)
 
         # Pass 2: check for unresolved LLM conditions
-        llm_decisions = _collect_llm_decisions(step.transitions)
+        llm_decisions = dispatch.decisions
         if llm_decisions:
             # Can't auto-resolve — present to Claude
             options = ", ".join(f'"{d["target"]}"' for d in llm_decisions)
@@ -399,17 +577,17 @@ class Executor:
             )
 
         # Pass 3: default transition (no condition)
-        for t in step.transitions:
-            if t.condition is None:
-                return self._move_to(t.target)
+        if dispatch.default_target is not None:
+            return self._move_to(dispatch.default_target)
 
         if not step.transitions:
-            self.state_manager.update_state(status="done")
+            self.state_manager.update_state(status=Status.DONE)
             return SubmitResult(True, "Workflow completed — no more transitions from this step.")
         return SubmitResult(
             False,
             f'No matching transition from step "{step.name}". '
             "None of the conditions were met and there is no default path.",
+            code=RejectCode.NO_TRANSITION,
         )
 
     def _move_to(self, target_name: str) -> SubmitResult:
@@ -421,21 +599,25 @@ class Executor:
                 False,
                 f'Target step "{target_name}" not found in the flow. '
                 "The workflow YAML may have changed.",
+                code=RejectCode.STEP_NOT_FOUND,
             )
+        # Callers may pass a _goto string; continue with the flow's interned name
+        target_name = target.name
+        dispatch = self._dispatch[target_name]
 
         # Loop header
-        if "iterate" in target.config:
+        if dispatch.is_loop:
             return self._handle_loop(target)
 
         # Terminate
-        if target.config.get("terminate"):
+        if dispatch.terminate:
             reason = target.config.get("reason", "workflow completed")
-            self.state_manager.update_state(current_step=target_name, status="done")
+            self.state_manager.update_state(current_step=target_name, status=Status.DONE)
             self.state_manager.add_history(state.flow_name, target_name, "terminate", reason)
             return SubmitResult(True, f"Workflow completed: {reason}")
 
         # Regular step
-        new_status = "waiting" if target.config.get("wait") else "running"
+        new_status = Status.WAITING if dispatch.wait else Status.RUNNING
         self.state_manager.update_state(current_step=target_name, status=new_status)
         self.state_manager.add_history(state.flow_name, target_name, "transition")
 
@@ -450,39 +632,42 @@ class Executor:
         flow = self._ensure_flow()
         step = flow.steps.get(state.current_step)
         if not step:
-            return SubmitResult(False, f'Step "{state.current_step}" not found.')
+            return SubmitResult(
+                False, f'Step "{state.current_step}" not found.', code=RejectCode.STEP_NOT_FOUND
+            )
         return self._follow_transitions(step)
 
     def _handle_loop(self, loop_step: StepDefinition) -> SubmitResult:
         state = self._require_state()
         loop_name = loop_step.name
+        dispatch = self._dispatch[loop_name]
         info = state.loop_state.get(loop_name)
 
         if info is None:
             ctx = self._build_context(state)
             items = evaluate_expression(loop_step.config["iterate"], ctx)
             if not isinstance(items, list) or not items:
-                if len(loop_step.transitions) > 1:
-                    return self._move_to(loop_step.transitions[1].target)
-                self.state_manager.update_state(status="done")
+                if dispatch.loop_exit is not None:
+                    return self._move_to(dispatch.loop_exit)
+                self.state_manager.update_state(status=Status.DONE)
                 return SubmitResult(True, f"Loop skipped (empty): {loop_name}")
 
             new_loop_state = {**state.loop_state, loop_name: {"i": 0, "n": len(items)}}
             self.state_manager.update_state(loop_state=new_loop_state)
-            return self._move_to(loop_step.transitions[0].target)
+            return self._move_to(dispatch.loop_body)
         else:
             i = info["i"] + 1
             n = info["n"]
             if i < n:
                 new_loop_state = {**state.loop_state, loop_name: {"i": i, "n": n}}
                 self.state_manager.update_state(loop_state=new_loop_state)
-                return self._move_to(loop_step.transitions[0].target)
+                return self._move_to(dispatch.loop_body)
             else:
                 new_loop_state = {k: v for k, v in state.loop_state.items() if k != loop_name}
                 self.state_manager.update_state(loop_state=new_loop_state)
-                if len(loop_step.transitions) > 1:
-                    return self._move_to(loop_step.transitions[1].target)
-                self.state_manager.update_state(status="done")
+                if dispatch.loop_exit is not None:
+                    return self._move_to(dispatch.loop_exit)
+                self.state_manager.update_state(status=Status.DONE)
                 return SubmitResult(True, f"Loop completed: {loop_name}")
 
 
@@ -497,11 +682,21 @@ def _collect_llm_decisions(transitions: list[Transition]) -> list[dict[str, str]
     return decisions
 
 
+def _not_waiting(state: WorkflowState) -> SubmitResult:
+    """approve/reject rejection; names the step, so it cannot be a shared result."""
+    return SubmitResult(
+        False,
+        f'Step "{state.current_step}" is not waiting for approval (status: {state.status}).',
+        code=RejectCode.NOT_WAITING,
+    )
+
+
 def _format_elapsed(started_at: str) -> str:
     if not started_at:
         return ""
     try:
-        start = datetime.strptime(started_at, "%Y-%m-%d %H:%M:%S").replace(tzinfo=UTC)
+        # fromisoformat is implemented in C; strptime goes through a regex per call
+        start = datetime.fromisoformat(started_at).replace(tzinfo=UTC)
         delta = datetime.now(tz=UTC) - start
         hours, remainder = divmod(int(delta.total_seconds()), 3600)
         minutes = remainder // 60
@@ -1,10 +1,33 @@
-"""Template expression evaluator for {{expr}} syntax."""
+"""Template expression evaluator for {{expr}} syntax.
+
+Expressions are compiled once into closures (cached per expression string),
+so conditions evaluated on every transition skip re-parsing.
+"""
 from __future__ import annotations
 
+import functools
+import operator
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 TEMPLATE_RE = re.compile(r"\{\{(.+?)\}\}")
+_NUMBER_RE = re.compile(r"^-?\d+(\.\d+)?$")
+_BRACKET_RE = re.compile(r"^(\w+)\[(\d+)\]$")
+
+# Checked in this order; the first operator found splits the expression
+_OPERATORS: tuple[tuple[str, Callable[[Any, Any], Any]], ...] = (
+    ("===", operator.eq),
+    ("!==", operator.ne),
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("==", operator.eq),
+    ("!=", operator.ne),
+    (">", operator.gt),
+    ("<", operator.lt),
+)
 
 
 def evaluate_template(template: str, context: dict[str, Any]) -> str:
@@ -15,57 +38,67 @@ def evaluate_template(template: str, context: dict[str, Any]) -> str:
 
 
 def evaluate_expression(expr: str, context: dict[str, Any]) -> Any:
+    return compile_expression(expr)(context)
+
+
+def evaluate_condition(condition: str, context: dict[str, Any]) -> bool:
+    return bool(evaluate_expression(condition, context))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expr: str) -> Callable[[dict[str, Any]], Any]:
+    """Compile an expression into a function of the evaluation context."""
     expr = expr.strip()
 
-    for op in ("===", "!==", ">=", "<=", "==", "!=", ">", "<"):
+    for op, compare in _OPERATORS:
         idx = expr.find(op)
         if idx != -1:
-            left = evaluate_expression(expr[:idx], context)
-            right = evaluate_expression(expr[idx + len(op):], context)
-            match op:
-                case "===" | "==":
-                    return left == right
-                case "!==" | "!=":
-                    return left != right
-                case ">":
-                    return left > right
-                case "<":
-                    return left < right
-                case ">=":
-                    return left >= right
-                case "<=":
-                    return left <= right
+            left = compile_expression(expr[:idx])
+            right = compile_expression(expr[idx + len(op):])
+            return lambda ctx: compare(left(ctx), right(ctx))
 
     if expr == "true":
-        return True
+        return lambda ctx: True
     if expr == "false":
-        return False
-    if re.match(r"^-?\d+(\.\d+)?$", expr):
-        return float(expr) if "." in expr else int(expr)
+        return lambda ctx: False
+    if _NUMBER_RE.match(expr):
+        number = float(expr) if "." in expr else int(expr)
+        return lambda ctx: number
     if (expr.startswith('"') and expr.endswith('"')) or (expr.startswith("'") and expr.endswith("'")):
-        return expr[1:-1]
+        text = expr[1:-1]
+        return lambda ctx: text
 
-    return _resolve_path(expr, context)
+    parts = tuple(_compile_part(part) for part in expr.split("."))
+    return lambda ctx: _resolve_path(parts, ctx)
 
 
-def _resolve_path(path: str, context: dict[str, Any]) -> Any:
+def compile_condition(condition: str) -> Callable[[dict[str, Any]], bool]:
+    """Compile a condition into a predicate over the evaluation context."""
+    evaluate = compile_expression(condition)
+    return lambda ctx: bool(evaluate(ctx))
+
+
+def _compile_part(part: str) -> tuple[str, int | None]:
+    """Split a path segment into (name, index); index is set for `name[N]`."""
+    bracket = _BRACKET_RE.match(part)
+    if bracket:
+        return bracket.group(1), int(bracket.group(2))
+    return part, None
+
+
+def _resolve_path(parts: tuple[tuple[str, int | None], ...], context: dict[str, Any]) -> Any:
     current: Any = context
-    for part in path.split("."):
+    for name, index in parts:
         if current is None:
             return None
-        bracket = re.match(r"^(\w+)\[(\d+)\]$", part)
-        if bracket:
-            current = current.get(bracket.group(1)) if isinstance(current, dict) else getattr(current, bracket.group(1), None)
+        if index is not None:
+            current = current.get(name) if isinstance(current, dict) else getattr(current, name, None)
             if isinstance(current, list):
-                current = current[int(bracket.group(2))]
+                current = current[index]
             else:
                 return None
         elif isinstance(current, dict):
-            current = current.get(part)
+            current = current.get(name)
         else:
-            current = getattr(current, part, None)
+            current = getattr(current, name, None)
     return current
-
-
-def evaluate_condition(condition: str, context: dict[str, Any]) -> bool:
-    return bool(evaluate_expression(condition, context))
@@ -1,3 +1,3 @@
-from vibe_linter.store.state import StateManager
+from vibe_linter.store.state import HISTORY_LIMIT, StateManager
 
-__all__ = ["StateManager"]
+__all__ = ["HISTORY_LIMIT", "StateManager"]
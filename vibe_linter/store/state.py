@@ -1,14 +1,24 @@
 """SQLite-backed workflow state persistence."""
 from __future__ import annotations
 
+import contextlib
 import json
+import math
 import sqlite3
+import sys
+from dataclasses import fields, replace
 from datetime import UTC, datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from vibe_linter.types import WorkflowState
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
     from pathlib import Path
 
 INIT_SQL = """
@@ -31,6 +41,8 @@ CREATE TABLE IF NOT EXISTS workflow_history (
     timestamp TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+CREATE INDEX IF NOT EXISTS idx_workflow_history_action ON workflow_history (action, id);
+
 CREATE TABLE IF NOT EXISTS workflow_checkpoints (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL UNIQUE,
@@ -40,18 +52,145 @@ CREATE TABLE IF NOT EXISTS workflow_checkpoints (
 );
 """
 
+HISTORY_COLUMNS = ("id", "flow_name", "step_path", "action", "data", "timestamp")
+
+# workflow_state columns stored as JSON text
+_JSON_COLUMNS = frozenset({"data", "loop_state"})
+
+# History rows the Executor keeps by default (see StateManager history_limit)
+HISTORY_LIMIT = 10_000
+
+# Trim history at most once every this many inserts
+_HISTORY_TRIM_INTERVAL = 256
+
+
+def _dumps(value: Any) -> str:
+    """Encode a column value as JSON text, with orjson when it is installed.
+
+    Values orjson rejects (e.g. integers beyond 64 bits) fall back to json.
+    So do NaN and Infinity, which orjson would silently write as null: the
+    stored value must not depend on whether orjson is installed.
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value)
+        except TypeError:
+            pass
+        else:
+            # NaN/Infinity become null, so only output containing null can be lossy
+            if b"null" not in encoded or not _has_non_finite(value):
+                return encoded.decode()
+    return json.dumps(value)
+
+
+def _has_non_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+def _loads(text: str | bytes) -> Any:
+    """Decode JSON column text written by _dumps().
+
+    Text from the json fallback (NaN, Infinity, integers beyond 64 bits)
+    is rejected by orjson, so it is decoded with json instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _state_from_row(row: tuple[Any, ...]) -> WorkflowState:
+    return WorkflowState(
+        flow_name=row[0],
+        # Interned to match the parsed flow's step keys (see parser._intern_names)
+        current_step=sys.intern(row[1]),
+        status=row[2],
+        data=_loads(row[3]),
+        loop_state=_loads(row[4]),
+        started_at=row[5],
+    )
+
+
+def _column_value(value: Any) -> Any:
+    """Archive columns hold nested values as JSON text."""
+    return _dumps(value) if isinstance(value, (dict, list)) else value
+
 
 class StateManager:
-    def __init__(self, db_path: str | Path):
+    def __init__(
+        self, db_path: str | Path, history_limit: int | None = None, *, durable: bool = True
+    ):
+        # Keep about the newest history_limit history rows; None keeps all.
+        # Trimming is batched, so the table holds at most
+        # history_limit + _history_trim_every - 1 rows.
+        if history_limit is not None and history_limit < 1:
+            raise ValueError(f"history_limit must be at least 1, got {history_limit}")
+        self.history_limit = history_limit
+        self._history_trim_every = min(history_limit or 1, _HISTORY_TRIM_INTERVAL)
         self.db = sqlite3.connect(str(db_path))
         self.db.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL only syncs at checkpoints and is still corruption-safe.
+        # durable=False never syncs: commits may be lost on power loss (for tests).
+        self.db.execute(f"PRAGMA synchronous = {'NORMAL' if durable else 'OFF'}")
         self.db.executescript(INIT_SQL)
+        self._tx_depth = 0
+        # Last state row read or written through this connection, and the
+        # PRAGMA data_version it was valid for (bumped by other connections' commits).
+        # _row holds the columns with data/loop_state as JSON text (None when only
+        # the decoded value is known); _state is the decoded row, built on demand.
+        self._row: tuple[Any, ...] | None = None
+        self._state: WorkflowState | None = None
+        self._row_version = -1
+
+    @contextlib.contextmanager
+    def transaction(self) -> Generator[None, None, None]:
+        """Group writes into one commit; rolled back if the block raises.
+
+        Nested blocks join the outermost one.
+        """
+        self._tx_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self.db.rollback()
+                self.invalidate_cache()
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self.db.commit()
+
+    def _commit(self) -> None:
+        if self._tx_depth == 0:
+            self.db.commit()
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached state; needed after writing to self.db directly."""
+        self._row = None
+        self._state = None
+
+    def _data_version(self) -> int:
+        return self.db.execute("PRAGMA data_version").fetchone()[0]
 
     def has_state(self) -> bool:
         row = self.db.execute("SELECT COUNT(*) FROM workflow_state").fetchone()
         return row[0] > 0
 
     def init_state(self, state: WorkflowState) -> None:
+        self._write_state(state)
+        # The caller keeps a reference to state, so it is not cached
+        self.invalidate_cache()
+
+    def _write_state(self, state: WorkflowState) -> None:
         self.db.execute(
             """INSERT OR REPLACE INTO workflow_state
                (id, flow_name, current_step, status, data, loop_state, started_at)
@@ -60,62 +199,204 @@ class StateManager:
                 state.flow_name,
                 state.current_step,
                 state.status,
-                json.dumps(state.data),
-                json.dumps(state.loop_state),
+                _dumps(state.data),
+                _dumps(state.loop_state),
                 state.started_at or datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S"),
             ),
         )
-        self.db.commit()
+        self._commit()
 
     def get_current_state(self) -> WorkflowState | None:
-        row = self.db.execute("SELECT * FROM workflow_state WHERE id = 1").fetchone()
-        if not row:
+        """Return the current state, or None if no workflow is active.
+
+        The result is the caller's own copy, decoded from the cached column
+        text: mutating its data or loop_state does not affect later reads.
+        Change state through update_state() / set_step_data().
+        """
+        row = self._cached_row()
+        if row is None:
             return None
-        return WorkflowState(
-            flow_name=row[1],
-            current_step=row[2],
-            status=row[3],
-            data=json.loads(row[4]),
-            loop_state=json.loads(row[5]),
-            started_at=row[6],
-        )
+        if row[3] is None or row[4] is None:
+            # Written through set_step_data(); encode the cached value once
+            state = self._state
+            row = self._row = (
+                *row[:3],
+                _dumps(state.data) if row[3] is None else row[3],
+                _dumps(state.loop_state) if row[4] is None else row[4],
+                row[5],
+            )
+        return _state_from_row(row)
+
+    def peek_state(self) -> WorkflowState | None:
+        """Like get_current_state(), but return the shared cached object.
+
+        It stays cached until this manager writes or another connection
+        commits. It is for read-only use by the executor and must not be
+        mutated or handed to outside callers.
+        """
+        row = self._cached_row()
+        if row is None:
+            return None
+        if self._state is None:
+            self._state = _state_from_row(row)
+        return self._state
+
+    def _cached_row(self) -> tuple[Any, ...] | None:
+        version = self._data_version()
+        if self._row is None or version != self._row_version:
+            self._state = None
+            self._row = self.db.execute(
+                """SELECT flow_name, current_step, status, data, loop_state, started_at
+                   FROM workflow_state WHERE id = 1"""
+            ).fetchone()
+            self._row_version = version
+        return self._row
 
     def update_state(self, **kwargs) -> None:
-        current = self.get_current_state()
+        current = self.peek_state()
+        if not current:
+            raise RuntimeError("No active workflow")
+        if not kwargs:
+            return
+        # replace() rejects unknown names, so kwargs keys are valid column names
+        updated = replace(current, **kwargs)
+        # Write only the changed columns: a status change does not re-encode data
+        encoded = {k: _dumps(v) for k, v in kwargs.items() if k in _JSON_COLUMNS}
+        assignments = ", ".join(f"{k} = ?" for k in kwargs)
+        values = [encoded[k] if k in encoded else getattr(updated, k) for k in kwargs]
+        self.db.execute(f"UPDATE workflow_state SET {assignments} WHERE id = 1", values)
+        self._commit()
+        # Cache decoded copies so the caller's dicts are not aliased by the cache
+        self._state = (
+            replace(updated, **{k: _loads(v) for k, v in encoded.items()}) if encoded else updated
+        )
+        row = self._row
+        self._row = (
+            updated.flow_name,
+            updated.current_step,
+            updated.status,
+            encoded.get("data", row[3]),
+            encoded.get("loop_state", row[4]),
+            updated.started_at,
+        )
+
+    def set_step_data(self, step_name: str, value: Any) -> None:
+        """Store one step's output under its name in state.data.
+
+        Only that entry is written (via json_set), so the cost does not grow
+        with the data accumulated by earlier steps.
+        """
+        if '"' in step_name:
+            # JSON path labels cannot escape a double quote; rewrite the whole map
+            self._rewrite_step_data(step_name, value)
+            return
+        encoded = _dumps(value)
+        try:
+            cur = self.db.execute(
+                "UPDATE workflow_state SET data = json_set(data, ?, json(?)) WHERE id = 1",
+                (f'$."{step_name}"', encoded),
+            )
+        except sqlite3.OperationalError:
+            # SQLite's JSON parser rejects NaN/Infinity from the json fallback
+            self._rewrite_step_data(step_name, value)
+            return
+        self._commit()
+        if cur.rowcount == 0:
+            self.invalidate_cache()
+            raise RuntimeError("No active workflow")
+        if self._state is None:
+            self.invalidate_cache()
+        else:
+            # Decode our own copy of value rather than aliasing the caller's dict
+            self._state = replace(
+                self._state, data={**self._state.data, step_name: _loads(encoded)}
+            )
+            # The new data text is only known to SQLite; re-encode it when needed
+            self._row = (*self._row[:3], None, *self._row[4:])
+
+    def _rewrite_step_data(self, step_name: str, value: Any) -> None:
+        current = self.peek_state()
         if not current:
             raise RuntimeError("No active workflow")
-        for k, v in kwargs.items():
-            setattr(current, k, v)
-        self.init_state(current)
+        self.update_state(data={**current.data, step_name: value})
 
     def add_history(self, flow_name: str, step_path: str, action: str, data: str | None = None) -> None:
-        self.db.execute(
+        cur = self.db.execute(
             "INSERT INTO workflow_history (flow_name, step_path, action, data) VALUES (?, ?, ?, ?)",
             (flow_name, step_path, action, data),
         )
-        self.db.commit()
-
-    def get_history(self, limit: int = 20) -> list[dict]:
-        rows = self.db.execute(
-            "SELECT id, flow_name, step_path, action, data, timestamp "
-            "FROM workflow_history ORDER BY id DESC LIMIT ?",
-            (limit,),
-        ).fetchall()
-        return [
-            {"id": r[0], "flow_name": r[1], "step_path": r[2],
-             "action": r[3], "data": r[4], "timestamp": r[5]}
-            for r in rows
-        ]
+        if self.history_limit is not None and cur.lastrowid % self._history_trim_every == 0:
+            # Ids grow with each insert, so this keeps the newest history_limit rows
+            self.db.execute(
+                "DELETE FROM workflow_history WHERE id <= ?", (cur.lastrowid - self.history_limit,)
+            )
+        self._commit()
+
+    def iter_history(self, limit: int = 20, action: str | None = None) -> Iterator[dict]:
+        """Yield history entries newest-first, fetching rows lazily from the cursor.
+
+        With action, only entries of that action are returned (via the action index).
+        """
+        columns = ", ".join(HISTORY_COLUMNS)
+        if action is None:
+            cursor = self.db.execute(
+                f"SELECT {columns} FROM workflow_history ORDER BY id DESC LIMIT ?", (limit,)
+            )
+        else:
+            cursor = self.db.execute(
+                f"SELECT {columns} FROM workflow_history WHERE action = ? ORDER BY id DESC LIMIT ?",
+                (action, limit),
+            )
+        for row in cursor:
+            yield dict(zip(HISTORY_COLUMNS, row, strict=True))
+
+    def iter_history_steps(self, limit: int = 20) -> Iterator[str]:
+        """Yield only the step_path of history entries, newest-first."""
+        cursor = self.db.execute(
+            "SELECT step_path FROM workflow_history ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        for (step_path,) in cursor:
+            yield step_path
+
+    def get_history(self, limit: int = 20, action: str | None = None) -> list[dict]:
+        return list(self.iter_history(limit, action))
 
     def save_checkpoint(self, name: str) -> None:
-        state = self.get_current_state()
+        # Snapshot the state row inside SQLite: the already-serialized data and
+        # loop_state columns are embedded as-is, so the cost no longer scales with
+        # decoding and re-encoding the accumulated step data in Python.
+        try:
+            cur = self.db.execute(
+                """INSERT OR REPLACE INTO workflow_checkpoints (name, flow_name, state)
+                   SELECT ?, flow_name, json_object(
+                       'flow_name', flow_name,
+                       'current_step', current_step,
+                       'status', status,
+                       'data', json(data),
+                       'loop_state', json(loop_state),
+                       'started_at', started_at
+                   )
+                   FROM workflow_state WHERE id = 1""",
+                (name,),
+            )
+        except sqlite3.OperationalError:
+            # SQLite's JSON parser rejects NaN/Infinity from the json fallback
+            self._save_checkpoint_encoded(name)
+            return
+        self._commit()
+        if cur.rowcount == 0:
+            raise RuntimeError("No active workflow")
+
+    def _save_checkpoint_encoded(self, name: str) -> None:
+        state = self.peek_state()
         if not state:
             raise RuntimeError("No active workflow")
+        encoded = _dumps({f.name: getattr(state, f.name) for f in fields(state)})
         self.db.execute(
             "INSERT OR REPLACE INTO workflow_checkpoints (name, flow_name, state) VALUES (?, ?, ?)",
-            (name, state.flow_name, json.dumps(state.__dict__)),
+            (name, state.flow_name, encoded),
         )
-        self.db.commit()
+        self._commit()
 
     def load_checkpoint(self, name: str) -> WorkflowState | None:
         row = self.db.execute(
@@ -123,7 +404,7 @@ class StateManager:
         ).fetchone()
         if not row:
             return None
-        return WorkflowState(**json.loads(row[0]))
+        return WorkflowState(**_loads(row[0]))
 
     def create_table(self, table_name: str, columns: dict[str, str]) -> None:
         type_map = {"number": "REAL", "boolean": "INTEGER", "string": "TEXT", "string[]": "TEXT"}
@@ -133,21 +414,28 @@ class StateManager:
             f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {col_defs}, "
             f"created_at TEXT NOT NULL DEFAULT (datetime('now')))"
         )
-        self.db.commit()
+        self._commit()
 
     def insert_row(self, table_name: str, data: dict) -> None:
-        keys = list(data.keys())
+        self.insert_rows(table_name, [data])
+
+    def insert_rows(self, table_name: str, rows: list[dict]) -> None:
+        """Insert rows that all have the first row's keys, with one statement and commit."""
+        if not rows:
+            return
+        keys = list(rows[0].keys())
         placeholders = ", ".join("?" for _ in keys)
-        values = [json.dumps(v) if isinstance(v, (dict, list)) else v for v in data.values()]
-        self.db.execute(
-            f'INSERT INTO "{table_name}" ({", ".join(keys)}) VALUES ({placeholders})', values
+        self.db.executemany(
+            f'INSERT INTO "{table_name}" ({", ".join(keys)}) VALUES ({placeholders})',
+            ([_column_value(row[k]) for k in keys] for row in rows),
         )
-        self.db.commit()
+        self._commit()
 
     def reset(self) -> None:
         self.db.execute("DELETE FROM workflow_state")
         self.db.execute("DELETE FROM workflow_history")
-        self.db.commit()
+        self._commit()
+        self.invalidate_cache()
 
     def close(self) -> None:
         self.db.close()
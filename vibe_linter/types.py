@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from enum import Enum
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -8,12 +9,12 @@ if TYPE_CHECKING:
 
 # ─── Flow Definition IR (parsed from YAML) ───
 
-@dataclass
+@dataclass(slots=True)
 class Transition:
     target: str
     condition: str | None = None  # None = default/unconditional
 
-@dataclass
+@dataclass(slots=True)
 class StepDefinition:
     name: str
     transitions: list[Transition] = field(default_factory=list)
@@ -24,7 +25,7 @@ class StepDefinition:
     #   iterate: "expr"   → loop header, engine manages iteration
     #   auto: True        → engine auto-evaluates transitions (assert/branch/jump)
 
-@dataclass
+@dataclass(slots=True)
 class FlowDefinition:
     name: str
     description: str = ""
@@ -33,19 +34,25 @@ class FlowDefinition:
 
 # ─── Edit Policy ───
 
-@dataclass
+@dataclass(slots=True)
 class EditPolicyPattern:
     glob: str
     policy: str  # silent | warn | block
 
-@dataclass
+@dataclass(slots=True)
 class EditPolicy:
     default: str = "silent"  # silent | warn | block
     patterns: list[EditPolicyPattern] = field(default_factory=list)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "default": self.default,
+            "patterns": [{"glob": p.glob, "policy": p.policy} for p in self.patterns],
+        }
+
 # ─── Node Definition (loaded from .py files) ───
 
-@dataclass
+@dataclass(slots=True)
 class NodeDefinition:
     name: str = ""
     types: list[str] = field(default_factory=list)
@@ -55,13 +62,51 @@ class NodeDefinition:
     edit_policy: EditPolicy | None = None
     archive: dict[str, str] | None = None
 
+    def status_payload(self) -> dict[str, Any]:
+        """The node section of get_status(), built fresh from the current fields.
+
+        Not cached: each caller needs its own nested dicts, and deep-copying
+        a cached payload costs more than building this one.
+        """
+        return {
+            "name": self.name,
+            "types": list(self.types),
+            "instructions": self.instructions or None,
+            "edit_policy": self.edit_policy.to_dict() if self.edit_policy else None,
+        }
+
 # ─── Workflow Runtime State ───
 
-@dataclass
+class Status(str, Enum):
+    """Workflow status. Members are str, so they compare equal to and
+    serialize as their plain values ("running", ...)."""
+
+    RUNNING = "running"
+    WAITING = "waiting"
+    STOPPED = "stopped"
+    DONE = "done"
+
+    def __str__(self) -> str:
+        return self.value
+
+    __format__ = str.__format__
+
+
+@dataclass(slots=True)
 class WorkflowState:
     flow_name: str
     current_step: str
-    status: str = "running"  # running | waiting | paused | done
+    status: Status = Status.RUNNING
     data: dict[str, Any] = field(default_factory=dict)
     loop_state: dict[str, Any] = field(default_factory=dict)  # {loop_name: {"i": N, "n": M}}
     started_at: str = ""
+
+    def __post_init__(self) -> None:
+        # Rows and checkpoints carry the plain string
+        try:
+            self.status = Status(self.status)
+        except ValueError:
+            expected = ", ".join(s.value for s in Status)
+            raise ValueError(
+                f"Unknown workflow status {self.status!r} (expected one of: {expected})"
+            ) from None